@@ -1,6 +1,6 @@
 """Adapter for pyubx2 library to enable cross-validation testing."""
 
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
 try:
     from pyubx2 import UBXReader, UBXMessage, GET, SET, POLL
@@ -15,6 +15,17 @@ except ImportError:
     UBXMessage = None
 
 
+class ParseResult(NamedTuple):
+    """Outcome of parsing one UBX frame with pyubx2."""
+    parsed: bool
+    name: str
+    fields: dict
+    error: Optional[str] = None
+    class_id: Optional[int] = None
+    message_id: Optional[int] = None
+    payload_length: Optional[int] = None
+
+
 def is_available() -> bool:
     """Check if pyubx2 is installed and available."""
     return PYUBX2_AVAILABLE
@@ -35,7 +46,7 @@ def get_supported_messages() -> list[str]:
     return sorted(messages)
 
 
-def parse_ubx_bytes(data: bytes, message_type: str = "output") -> Optional[dict]:
+def parse_ubx_bytes(data: bytes, message_type: str = "output") -> ParseResult:
     """Parse UBX bytes using pyubx2.
     
     Args:
@@ -43,7 +54,8 @@ def parse_ubx_bytes(data: bytes, message_type: str = "output") -> Optional[dict]
         message_type: Our schema's message_type to determine pyubx2 mode
     
     Returns:
-        Dict with parsed message info, or None if parsing failed
+        ParseResult with the parsed message info; on failure parsed is
+        False and error says why
     """
     if not PYUBX2_AVAILABLE:
         raise RuntimeError("pyubx2 is not installed")
@@ -71,7 +83,7 @@ def parse_ubx_bytes(data: bytes, message_type: str = "output") -> Optional[dict]
         raw, parsed = reader.read()
         
         if parsed is None:
-            return {"error": "pyubx2 returned None (unknown message or mode)", "parsed": False}
+            return ParseResult(False, "", {}, "pyubx2 returned None (unknown message or mode)")
         
         # Extract field values
         fields = {}
@@ -84,16 +96,30 @@ def parse_ubx_bytes(data: bytes, message_type: str = "output") -> Optional[dict]
                 except:
                     pass
         
-        return {
-            "name": parsed.identity,
-            "class_id": parsed.msg_cls[0] if isinstance(parsed.msg_cls, bytes) else parsed.msg_cls,
-            "message_id": parsed.msg_id[0] if isinstance(parsed.msg_id, bytes) else parsed.msg_id,
-            "payload_length": parsed.length,
-            "fields": fields,
-            "parsed": True,
-        }
+        return ParseResult(
+            parsed=True,
+            name=parsed.identity,
+            fields=fields,
+            class_id=parsed.msg_cls[0] if isinstance(parsed.msg_cls, bytes) else parsed.msg_cls,
+            message_id=parsed.msg_id[0] if isinstance(parsed.msg_id, bytes) else parsed.msg_id,
+            payload_length=parsed.length,
+        )
     except Exception as e:
-        return {"error": str(e), "parsed": False}
+        return ParseResult(False, "", {}, str(e))
+
+
+def parse_many(buffers, message_type: str = "output") -> list[ParseResult]:
+    """Parse several UBX frames with pyubx2 in one call.
+    
+    Args:
+        buffers: Iterable of raw UBX message bytes
+        message_type: Our schema's message_type, applied to every frame
+    
+    Returns:
+        List of parse_ubx_bytes results, in input order
+    """
+    _parse = parse_ubx_bytes
+    return [_parse(data, message_type) for data in buffers]
 
 
 def generate_ubx_message(msg_name: str, field_values: dict) -> Optional[bytes]:
@@ -201,16 +201,13 @@ def normalize_message_name(name: str) -> str:
     return name.upper().replace(" ", "-").replace("_", "-")
 
 
+# Every name that counts as supported, including the alternative spellings
+_SUPPORTED_NAMES = frozenset(UBLOX_RS_MESSAGES).union(*UBLOX_RS_NAME_MAP.values())
+
+
 def is_in_ublox_rs(message_name: str) -> bool:
     """Check if a message is supported by ublox-rs."""
-    normalized = normalize_message_name(message_name)
-    if normalized in UBLOX_RS_MESSAGES:
-        return True
-    # Check alternative names
-    for alt_names in UBLOX_RS_NAME_MAP.values():
-        if normalized in alt_names:
-            return True
-    return False
+    return normalize_message_name(message_name) in _SUPPORTED_NAMES
 
 
 if __name__ == "__main__":
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """Generate a coverage report showing which messages have been tested."""
 
+import argparse
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -45,6 +52,8 @@ def run_coverage_analysis():
     messages = get_all_messages()
     pyubx2_msgs = set(get_supported_messages()) if pyubx2_available() else set()
     ublox_rs_msgs = get_ublox_rs_messages() if UBLOX_RS_AVAILABLE else set()
+    # pyubx2 names with and without the "UBX-" prefix, for one set lookup per message
+    pyubx2_names = pyubx2_msgs | {f"UBX-{m}" for m in pyubx2_msgs if not m.startswith("UBX-")}
     
     results = {
         "generated": datetime.now().isoformat(),
@@ -71,6 +80,7 @@ def run_coverage_analysis():
     # Check if ublox-rs validator is available
     ublox_rs_can_test = UBLOX_RS_AVAILABLE and ublox_rs_validator_available()
     results["ublox_rs_validator_available"] = ublox_rs_can_test
+    ublox_rs_jobs = []
     
     for msg in messages:
         name = msg.get("name", "UNKNOWN")
@@ -80,7 +90,7 @@ def run_coverage_analysis():
             "message_id": msg.get("message_id"),
             "round_trip": None,
             "pyubx2": None,
-            "in_pyubx2": name in pyubx2_msgs or name.replace("UBX-", "") in pyubx2_msgs,
+            "in_pyubx2": name in pyubx2_names,
             "in_ublox_rs": is_in_ublox_rs(name),
             "ublox_rs": None,
         }
@@ -91,51 +101,76 @@ def run_coverage_analysis():
         else:
             results["summary"]["ublox_rs_not_covered"] += 1
         
-        # Test round-trip
+        # Generate the test frame once and share it between validators
         try:
             values = generate_test_values(msg)
             data = generate_ubx_message(msg, values)
-            parsed = parse_ubx_message(data, msg)
-            
-            if parsed["parsed"]:
-                msg_result["round_trip"] = "pass"
-                results["summary"]["round_trip_pass"] += 1
-            else:
-                msg_result["round_trip"] = "fail"
-                results["summary"]["round_trip_fail"] += 1
+            gen_error = None
         except Exception as e:
-            msg_result["round_trip"] = f"error: {str(e)[:50]}"
+            data = None
+            gen_error = f"error: {str(e)[:50]}"
+
+        # Test round-trip
+        if gen_error:
+            msg_result["round_trip"] = gen_error
             results["summary"]["round_trip_fail"] += 1
+        else:
+            try:
+                parsed = parse_ubx_message(data, msg)
+
+                if parsed["parsed"]:
+                    msg_result["round_trip"] = "pass"
+                    results["summary"]["round_trip_pass"] += 1
+                else:
+                    msg_result["round_trip"] = "fail"
+                    results["summary"]["round_trip_fail"] += 1
+            except Exception as e:
+                msg_result["round_trip"] = f"error: {str(e)[:50]}"
+                results["summary"]["round_trip_fail"] += 1
         
         # Test with pyubx2
         if pyubx2_available() and parse_ubx_bytes:
-            try:
-                if msg_result.get("in_pyubx2"):
-                    values = generate_test_values(msg)
-                    data = generate_ubx_message(msg, values)
+            if not msg_result.get("in_pyubx2"):
+                msg_result["pyubx2"] = "not_supported"
+                results["summary"]["pyubx2_not_supported"] += 1
+            elif gen_error:
+                msg_result["pyubx2"] = gen_error
+                results["summary"]["pyubx2_fail"] += 1
+            else:
+                try:
                     msg_type = msg.get("message_type", "output")
                     result = parse_ubx_bytes(data, msg_type)
-                    
-                    if result and result.get("parsed"):
+
+                    if result.parsed:
                         msg_result["pyubx2"] = "pass"
                         results["summary"]["pyubx2_pass"] += 1
                     else:
-                        msg_result["pyubx2"] = f"fail: {result.get('error', 'unknown')[:50]}"
+                        msg_result["pyubx2"] = f"fail: {(result.error or 'unknown')[:50]}"
                         results["summary"]["pyubx2_fail"] += 1
-                else:
-                    msg_result["pyubx2"] = "not_supported"
-                    results["summary"]["pyubx2_not_supported"] += 1
-            except Exception as e:
-                msg_result["pyubx2"] = f"error: {str(e)[:50]}"
-                results["summary"]["pyubx2_fail"] += 1
+                except Exception as e:
+                    msg_result["pyubx2"] = f"error: {str(e)[:50]}"
+                    results["summary"]["pyubx2_fail"] += 1
         
-        # Test with ublox-rs validator
+        # Queue for the ublox-rs validator (run as one concurrent batch below)
         if ublox_rs_can_test and parse_ubx_bytes_with_ublox_rs:
-            try:
-                if msg_result.get("in_ublox_rs"):
-                    values = generate_test_values(msg)
-                    data = generate_ubx_message(msg, values)
-                    result = parse_ubx_bytes_with_ublox_rs(data)
+            if not msg_result.get("in_ublox_rs"):
+                msg_result["ublox_rs"] = "not_supported"
+                results["summary"]["ublox_rs_not_tested"] += 1
+            elif gen_error:
+                msg_result["ublox_rs"] = gen_error
+                results["summary"]["ublox_rs_fail"] += 1
+            else:
+                ublox_rs_jobs.append((msg_result, data))
+        
+        results["tests"].append(msg_result)
+
+    # The validator is one subprocess per frame, so run them concurrently
+    if ublox_rs_jobs:
+        with ThreadPoolExecutor() as pool:
+            futures = [pool.submit(parse_ubx_bytes_with_ublox_rs, data) for _, data in ublox_rs_jobs]
+            for (msg_result, _), future in zip(ublox_rs_jobs, futures):
+                try:
+                    result = future.result()
                     
                     if result and result.get("parsed"):
                         msg_result["ublox_rs"] = "pass"
@@ -143,14 +178,9 @@ def run_coverage_analysis():
                     else:
                         msg_result["ublox_rs"] = f"fail: {result.get('error', 'unknown')[:50]}"
                         results["summary"]["ublox_rs_fail"] += 1
-                else:
-                    msg_result["ublox_rs"] = "not_supported"
-                    results["summary"]["ublox_rs_not_tested"] += 1
-            except Exception as e:
-                msg_result["ublox_rs"] = f"error: {str(e)[:50]}"
-                results["summary"]["ublox_rs_fail"] += 1
-        
-        results["tests"].append(msg_result)
+                except Exception as e:
+                    msg_result["ublox_rs"] = f"error: {str(e)[:50]}"
+                    results["summary"]["ublox_rs_fail"] += 1
     
     return results
 
@@ -214,8 +244,22 @@ def print_summary(results: dict):
     print("\n" + "=" * 60)
 
 
+def dump_report(results: dict, pretty: bool = False) -> bytes:
+    """Serialize the report in memory so it can be written in one go."""
+    if orjson is not None:
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(results, indent=2).encode()
+    return json.dumps(results, separators=(",", ":")).encode()
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate a UBX schema test coverage report")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Write indented JSON instead of compact JSON")
+    args = parser.parse_args()
+
     print("Running coverage analysis...")
     results = run_coverage_analysis()
     
@@ -227,8 +271,7 @@ def main():
     reports_dir.mkdir(exist_ok=True)
     
     report_file = reports_dir / "coverage_report.json"
-    with open(report_file, "w") as f:
-        json.dump(results, f, indent=2)
+    report_file.write_bytes(dump_report(results, pretty=args.pretty))
     
     print(f"\nFull report saved to: {report_file}")
 
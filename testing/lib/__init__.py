@@ -1,5 +1,23 @@
 """UBX codec library for testing."""
 
-from .schema_loader import load_schema, get_message_by_name, get_message_by_ids
-from .ubx_generator import generate_ubx_message, generate_test_values
+from .schema_loader import (
+    load_schema,
+    dump_schema_snapshot,
+    load_schema_snapshot,
+    get_all_messages,
+    get_message_by_name,
+    get_message_by_ids,
+    get_message_ids,
+    get_variant_by_alias,
+    select_variant_by_payload,
+    is_fixed_length,
+    parse_hex_id,
+)
+from .ubx_generator import (
+    generate_ubx_message,
+    generate_ubx_batch,
+    generate_test_values,
+    compile_encoder,
+    clear_caches,
+)
 from .ubx_parser import parse_ubx_message, UBXParseError
@@ -0,0 +1,24 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Optional Cython build of the UBX checksum kernel.
+
+Not built by default. To compile it in place:
+
+    pip install cython
+    cythonize -i testing/lib/_ubx_fast.pyx
+
+_ubx_native picks it up when the extension is importable.
+"""
+
+
+cpdef tuple fletcher(const unsigned char[::1] data):
+    """UBX Fletcher checksum of a contiguous bytes-like object."""
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = data.shape[0]
+    cdef unsigned char ck_a = 0
+    cdef unsigned char ck_b = 0
+    # unsigned char arithmetic wraps mod 256, so no masking is needed
+    with nogil:
+        for i in range(n):
+            ck_a += data[i]
+            ck_b += ck_a
+    return ck_a, ck_b
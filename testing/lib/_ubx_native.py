@@ -0,0 +1,122 @@
+"""Optional accelerated kernels for the UBX codec.
+
+Cython, numba and numpy are not hard dependencies. fletcher() is the
+compiled _ubx_fast extension when it has been built, a pair of vectorized
+numpy reductions when numpy is installed, and plain Python otherwise.
+
+numba is used only when opted into, with enable_numba() or by setting
+UBX_USE_NUMBA=1. numpy and numba are imported on the first checksum long
+enough to use them, never when the module is imported.
+"""
+
+import os
+from importlib.util import find_spec
+from itertools import accumulate
+
+try:
+    from ._ubx_fast import fletcher as _fletcher_c
+except ImportError:
+    _fletcher_c = None
+
+CYTHON_AVAILABLE = _fletcher_c is not None
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and find_spec("numba") is not None
+
+# Below this many bytes numpy's per-call overhead outweighs the vectorized sums
+_NUMPY_MIN_LEN = 64
+
+# Importing and compiling numba takes a while; only a checksum this long
+# loads it, after which it also takes the shorter numpy-sized buffers
+_NUMBA_MIN_LEN = 4096
+
+# Class, id, length and the largest possible payload
+_MAX_CHECKSUMMED_LEN = 4 + 0xFFFF
+
+_use_numba = NUMBA_AVAILABLE and os.environ.get("UBX_USE_NUMBA") == "1"
+
+# Filled in on first use
+_np = None
+_weights = None
+_fletcher_numba = None
+
+
+def fletcher_py(data) -> tuple[int, int]:
+    """UBX Fletcher checksum of a bytes-like object in plain Python."""
+    # ck_a is the byte sum and ck_b the sum of its running totals; reducing
+    # mod 256 once at the end keeps both sums in C
+    return sum(data) & 0xFF, sum(accumulate(data)) & 0xFF
+
+
+def enable_numba(enabled: bool = True) -> None:
+    """Checksum long buffers with a numba-compiled loop (off by default).
+
+    The kernel is compiled on the first checksum of at least _NUMBA_MIN_LEN
+    bytes. Has no effect when the Cython extension is built.
+
+    Raises:
+        ImportError: If enabling and numba or numpy is not installed.
+    """
+    global _use_numba
+    if enabled and not NUMBA_AVAILABLE:
+        raise ImportError("numba and numpy are required for enable_numba()")
+    _use_numba = enabled
+
+
+def _load_numpy():
+    global _np, _weights
+    import numpy as np
+
+    # ck_b is the weighted sum of the bytes with weights N..1; slicing the tail
+    # of one descending vector gives the weights for any length N
+    _weights = np.arange(_MAX_CHECKSUMMED_LEN, 0, -1, dtype=np.uint64)
+    _np = np
+    return np
+
+
+def _load_numba():
+    global _fletcher_numba
+    from numba import njit, types
+
+    # Explicit signatures compile eagerly and can never fall back to object
+    # mode; np.frombuffer gives read-only arrays for bytes, writable ones for
+    # bytearray, so both are declared
+    checksum = types.UniTuple(types.uint8, 2)
+    signatures = [
+        checksum(types.Array(types.uint8, 1, "C", readonly=True)),
+        checksum(types.uint8[::1]),
+    ]
+
+    @njit(signatures, cache=True, boundscheck=False)
+    def kernel(buf):
+        ck_a = 0
+        ck_b = 0
+        for i in range(buf.shape[0]):
+            ck_a = (ck_a + buf[i]) & 0xFF
+            ck_b = (ck_b + ck_a) & 0xFF
+        return ck_a, ck_b
+
+    _fletcher_numba = kernel
+    return kernel
+
+
+def fletcher_accel(data) -> tuple[int, int]:
+    """UBX Fletcher checksum of a bytes-like object via numpy (or numba)."""
+    n = len(data)
+    if n < _NUMPY_MIN_LEN:
+        return fletcher_py(data)
+    np = _np or _load_numpy()
+    if _use_numba and (_fletcher_numba is not None or n >= _NUMBA_MIN_LEN):
+        kernel = _fletcher_numba or _load_numba()
+        return kernel(np.frombuffer(data, dtype=np.uint8))
+    if n > _MAX_CHECKSUMMED_LEN:
+        return fletcher_py(data)
+    a = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    return int(a.sum()) & 0xFF, int(np.dot(_weights[_MAX_CHECKSUMMED_LEN - n:], a)) & 0xFF
+
+
+if CYTHON_AVAILABLE:
+    fletcher = _fletcher_c
+elif NUMPY_AVAILABLE:
+    fletcher = fletcher_accel
+else:
+    fletcher = fletcher_py
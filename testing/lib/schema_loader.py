@@ -1,44 +1,146 @@
 """Load and query the UBX message schema."""
 
 import json
+import mmap
+import pickle
+import threading
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Cache for loaded schema
 _schema_cache: Optional[dict] = None
+_schema_lock = threading.Lock()
+
+# Lookup indexes built alongside the cache
+_messages_by_name: dict[str, dict] = {}
+_messages_by_ids: dict[tuple[int, int], dict] = {}
+
+# Parsed (class_id, message_id) of each loaded message, keyed by id(message).
+# The message is kept in the entry so only that exact dict matches.
+_ids_by_message: dict[int, tuple[dict, tuple[int, int]]] = {}
 
 
 def load_schema(schema_path: Optional[Path] = None) -> dict:
-    """Load the UBX message schema from JSON file."""
+    """Load the UBX message schema from JSON file.
+
+    Safe to call from several threads; the file is parsed once.
+    """
     global _schema_cache
     
     if _schema_cache is not None:
         return _schema_cache
     
-    if schema_path is None:
-        # Default path relative to this file
-        schema_path = Path(__file__).parent.parent.parent / "data" / "messages" / "ubx_messages.json"
-    
-    with open(schema_path) as f:
-        _schema_cache = json.load(f)
+    with _schema_lock:
+        if _schema_cache is not None:
+            return _schema_cache
+
+        if schema_path is None:
+            # Default path relative to this file
+            schema_path = Path(__file__).parent.parent.parent / "data" / "messages" / "ubx_messages.json"
+
+        data = Path(schema_path).read_bytes()
+        schema = orjson.loads(data) if orjson is not None else json.loads(data)
+        _build_indexes(schema)
+        # Publish only once the indexes are in place
+        _schema_cache = schema
     
     return _schema_cache
 
 
+def _build_indexes(schema: dict) -> None:
+    """Index messages by name, variant alias and (class_id, message_id).
+
+    Also records each message's parsed ids for get_message_ids, beside the
+    schema rather than in it.
+
+    The first message in schema order wins, matching a linear scan.
+    """
+    by_name = {}
+    by_ids = {}
+    ids_by_message = {}
+    for msg in schema.get("messages", []):
+        name = msg.get("name")
+        if name is not None:
+            by_name.setdefault(name, msg)
+        for alias in msg.get("variant_aliases", []):
+            by_name.setdefault(alias, msg)
+        try:
+            ids = (parse_hex_id(msg.get("class_id")), parse_hex_id(msg.get("message_id")))
+        except (TypeError, ValueError):
+            continue
+        by_ids.setdefault(ids, msg)
+        ids_by_message[id(msg)] = (msg, ids)
+
+    _messages_by_name.clear()
+    _messages_by_name.update(by_name)
+    _messages_by_ids.clear()
+    _messages_by_ids.update(by_ids)
+    _ids_by_message.clear()
+    _ids_by_message.update(ids_by_message)
+
+
+def _index_message_ids(schema: dict) -> None:
+    """Rebuild the get_message_ids index for a schema's messages."""
+    _ids_by_message.clear()
+    for msg in schema.get("messages", []):
+        try:
+            ids = (parse_hex_id(msg.get("class_id")), parse_hex_id(msg.get("message_id")))
+        except (TypeError, ValueError):
+            continue
+        _ids_by_message[id(msg)] = (msg, ids)
+
+
+def dump_schema_snapshot(snapshot_path: Path) -> Path:
+    """Pickle the loaded schema and its indexes for worker processes.
+
+    Workers call load_schema_snapshot on the file instead of parsing the
+    JSON schema again.
+    """
+    schema = load_schema()
+    with open(snapshot_path, "wb") as f:
+        pickle.dump((schema, _messages_by_name, _messages_by_ids), f, protocol=pickle.HIGHEST_PROTOCOL)
+    return Path(snapshot_path)
+
+
+def load_schema_snapshot(snapshot_path: Path) -> dict:
+    """Install a schema written by dump_schema_snapshot as the loaded schema.
+
+    Suitable as a process pool initializer. The file is memory-mapped, so
+    workers share the page-cached bytes. A schema already loaded in this
+    process (e.g. inherited through fork) is kept.
+    """
+    global _schema_cache
+
+    with _schema_lock:
+        if _schema_cache is not None:
+            return _schema_cache
+
+        with open(snapshot_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            schema, by_name, by_ids = pickle.load(mm)
+        _messages_by_name.clear()
+        _messages_by_name.update(by_name)
+        _messages_by_ids.clear()
+        _messages_by_ids.update(by_ids)
+        # Keyed by object id, so rebuilt for the unpickled messages
+        _index_message_ids(schema)
+        _schema_cache = schema
+
+    return _schema_cache
+
+
 def get_message_by_name(name: str) -> Optional[dict]:
     """Get message definition by name (e.g., 'UBX-NAV-PVT').
 
     Also searches variant_aliases for backward compatibility with legacy names
     like 'UBX-MGA-GPS-EPH'.
     """
-    schema = load_schema()
-    for msg in schema.get("messages", []):
-        if msg.get("name") == name:
-            return msg
-        # Check variant_aliases for backward compatibility
-        if name in msg.get("variant_aliases", []):
-            return msg
-    return None
+    load_schema()
+    return _messages_by_name.get(name)
 
 
 def get_variant_by_alias(alias: str) -> Optional[tuple[dict, dict]]:
@@ -114,19 +216,18 @@ def select_variant_by_payload(msg: dict, payload: bytes) -> Optional[dict]:
 
 def get_message_by_ids(class_id: int, message_id: int) -> Optional[dict]:
     """Get message definition by class and message IDs."""
-    schema = load_schema()
-    for msg in schema.get("messages", []):
-        msg_class = msg.get("class_id")
-        msg_id = msg.get("message_id")
-        
-        # Handle hex string or int
-        if isinstance(msg_class, str):
-            msg_class = int(msg_class, 16)
-        if isinstance(msg_id, str):
-            msg_id = int(msg_id, 16)
-        
-        if msg_class == class_id and msg_id == message_id:
-            return msg
+    load_schema()
+    return _messages_by_ids.get((class_id, message_id))
+
+
+def get_message_ids(message: dict) -> Optional[tuple[int, int]]:
+    """Parsed (class_id, message_id) of a message loaded by load_schema.
+
+    Returns None for any other dict, including copies of schema messages.
+    """
+    entry = _ids_by_message.get(id(message))
+    if entry is not None and entry[0] is message:
+        return entry[1]
     return None
 
 
@@ -136,6 +237,12 @@ def get_all_messages() -> list:
     return schema.get("messages", [])
 
 
+def is_fixed_length(msg: dict) -> bool:
+    """True if the message has a fixed payload length."""
+    length = (msg.get("payload") or {}).get("length", {})
+    return (isinstance(length, dict) and "fixed" in length) or isinstance(length, int)
+
+
 def parse_hex_id(value) -> int:
     """Parse a hex string or int to int."""
     if isinstance(value, str):
@@ -1,78 +1,139 @@
 """Generate UBX binary messages from schema definitions."""
 
+import copy
+import os
 import struct
 import random
-from typing import Any, Optional
-
-from .schema_loader import parse_hex_id, get_variant_by_alias
+import tempfile
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, NamedTuple, Optional
+
+from ._ubx_native import fletcher
+from .schema_loader import (
+    parse_hex_id,
+    get_variant_by_alias,
+    get_message_by_name,
+    get_message_ids,
+    dump_schema_snapshot,
+    load_schema_snapshot,
+)
+from .ubx_types import DATA_TYPE_MAP, TypeSpec, array_struct, parse_type
 
 # UBX sync characters
 SYNC_CHAR_1 = 0xB5
 SYNC_CHAR_2 = 0x62
 
-# Data type to struct format and size
-DATA_TYPE_MAP = {
-    "U1": ("B", 1),
-    "I1": ("b", 1),
-    "X1": ("B", 1),
-    "U2": ("H", 2),
-    "I2": ("h", 2),
-    "X2": ("H", 2),
-    "U4": ("I", 4),
-    "I4": ("i", 4),
-    "X4": ("I", 4),
-    "R4": ("f", 4),
-    "R8": ("d", 8),
-    "CH": ("c", 1),  # Character
+# Compiled little-endian Struct per data type; unknown types encode as U1
+_STRUCTS = {name: struct.Struct(f"<{fmt}") for name, (fmt, _) in DATA_TYPE_MAP.items()}
+_DEFAULT_STRUCT = _STRUCTS["U1"]
+
+# Little-endian payload length in the frame header
+_PAYLOAD_LEN = struct.Struct("<H")
+
+# array typecodes for single-byte types (no byte-order concerns)
+_BYTE_ARRAY_CODES = {"U1": "B", "X1": "B", "I1": "b"}
+
+# array typecodes matching each integer type's range, for drawing random values
+_INT_ARRAY_CODES = {
+    **_BYTE_ARRAY_CODES,
+    "U2": "H", "X2": "H", "I2": "h",
+    "U4": "I", "X4": "I", "I4": "i",
 }
 
+# Zero bytes emitted for reserved fields without encoding a value
+_ZERO_SLAB = memoryview(bytes(4096))
+
+# Sort key for fields without an integer byte_offset, ordering them last
+_NO_OFFSET = float("inf")
+
+
+class _Layout(NamedTuple):
+    """Precomputed payload layout for one message (or message variant)."""
+    payload: dict
+    variant: Optional[dict]
+    fields: tuple  # (byte_offset, name, spec, size, packer, reserved) sorted by offset
+    payload_size: int  # Payload length when every field has a static size
+    has_variable: bool  # True when the payload length depends on field values
+    groups: tuple  # One _Group per repeated group
+    field_names: tuple  # Names from fields, in the same order
+    fields_struct: Optional[struct.Struct]  # Packs all top-level fields in one call when all are scalar
+
+
+class _Group(NamedTuple):
+    """Precomputed layout of one repeated group."""
+    definition: dict
+    name: str
+    fields: tuple  # (byte_offset, name, spec) sorted by offset
+    field_names: tuple  # Field names in the same order, for tuple instances
+    instance_struct: Optional[struct.Struct]  # Packs a whole instance when every field is scalar
+    group_size: Any  # group_size_bytes, each instance is padded up to it when set
+
+
+# Layouts keyed by (id(message), variant_name). The message itself is kept in
+# the entry so a recycled id can never hand back a stale layout. A message
+# is read once, on first use; later changes to the same dict are not seen.
+_layout_cache: dict[tuple[int, Optional[str]], tuple[dict, _Layout]] = {}
+
+# Test values keyed by (id(message), num_repeated, variant_name), same scheme
+_test_values_cache: dict[tuple[int, int, Optional[str]], tuple[dict, dict]] = {}
+
+# Encoders from compile_encoder keyed by (id(message), variant_name), same scheme
+_encoder_cache: dict[tuple[int, Optional[str]], tuple[dict, Any]] = {}
+
+# Entries per cache. Bounded so ad-hoc message dicts aren't kept alive
+# forever; oldest go first.
+_CACHE_SIZE = 1024
+
+
+def _cache_put(cache: dict, key, entry) -> None:
+    """Store an entry, evicting the oldest once the cache is full."""
+    if len(cache) >= _CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = entry
+
+
+def clear_caches() -> None:
+    """Drop all cached layouts, encoders and test values.
+
+    The next call for a message recomputes them, picking up any changes
+    made to the message dict in the meantime.
+    """
+    _layout_cache.clear()
+    _test_values_cache.clear()
+    _encoder_cache.clear()
+
+# Source of a specialized encoder for a fixed, all-scalar payload. The field
+# names are spliced in as literals so a call is one pack_into plus checksum.
+_ENCODER_SOURCE = """\
+def encode(field_values=None):
+    if field_values is None:
+        field_values = generate_test_values(message, variant_name=variant_name)
+{discriminator}    frame = bytearray(template)
+    try:
+        pack_into(frame, 6, {args})
+    except struct_error:
+        return generate_fixed_frame(layout, class_id, msg_id, field_values)
+    frame[-2], frame[-1] = fletcher(memoryview(frame)[2:-2])
+    return bytes(frame)
+"""
+
+_DISCRIMINATOR_SOURCE = """\
+    if disc_field not in field_values:
+        field_values[disc_field] = disc_value
+"""
+
 
 def calculate_checksum(data: bytes) -> tuple[int, int]:
     """Calculate UBX checksum (Fletcher algorithm)."""
-    ck_a = 0
-    ck_b = 0
-    for byte in data:
-        ck_a = (ck_a + byte) & 0xFF
-        ck_b = (ck_b + ck_a) & 0xFF
-    return ck_a, ck_b
+    return fletcher(data)
 
 
 def get_field_size(data_type) -> int:
     """Get the size in bytes for a data type."""
-    # Handle data_type being a dict with array_of
-    if isinstance(data_type, dict):
-        if "array_of" in data_type:
-            base_type = data_type["array_of"]
-            # Handle nested structures (complex array_of with dict)
-            if isinstance(base_type, dict):
-                return 0  # Can't determine size of complex nested structures
-            count = data_type.get("count", 1)
-            # Handle variable count (string like 'N' or count_field) - use 0 for variable-length
-            if not isinstance(count, int):
-                return 0
-            base_size = DATA_TYPE_MAP.get(base_type, ("B", 1))[1]
-            return base_size * count
-        # Handle other dict formats (num_elements_field, elements, etc.)
-        if "elements" in data_type or "num_elements_field" in data_type:
-            return 0  # Variable-length complex structure
-        data_type = data_type.get("type", "U1")
-    if not isinstance(data_type, str):
-        return 1
-
-    # Handle array types like "U1[6]" or "CH[30]" or "U1[]" (variable length)
-    if "[" in data_type:
-        base_type = data_type.split("[")[0]
-        count_str = data_type.split("[")[1].rstrip("]")
-        if not count_str:  # Empty count like "U1[]"
-            return 0
-        try:
-            count = int(count_str)
-        except ValueError:
-            return 0  # Variable count like "U1[N]"
-        base_size = DATA_TYPE_MAP.get(base_type, ("B", 1))[1]
-        return base_size * count
-
-    return DATA_TYPE_MAP.get(data_type, ("B", 1))[1]
+    return parse_type(data_type).size
 
 
 def get_message_payload(message: dict, variant_name: Optional[str] = None) -> tuple[dict, Optional[dict]]:
@@ -100,9 +161,105 @@ def get_message_payload(message: dict, variant_name: Optional[str] = None) -> tu
         return message.get("payload", {}), None
 
 
+def _offset_sort_key(field: dict) -> float:
+    """Sort key putting integer byte_offsets first, in order, and the rest last."""
+    offset = field.get("byte_offset")
+    return offset if isinstance(offset, int) else _NO_OFFSET
+
+
+def _sort_by_offset(fields: list) -> list:
+    """Order fields by byte_offset, skipping the sort when already in order."""
+    keys = [_offset_sort_key(f) for f in fields]
+    if all(a <= b for a, b in zip(keys, keys[1:])):
+        return fields
+    return sorted(fields, key=_offset_sort_key)
+
+
+def _prepare(message: dict, variant_name: Optional[str] = None) -> _Layout:
+    """Compute (once) the sorted field layout and static size of a payload."""
+    key = (id(message), variant_name)
+    cached = _layout_cache.get(key)
+    if cached is not None and cached[0] is message:
+        return cached[1]
+
+    payload, variant = get_message_payload(message, variant_name)
+    has_variable = bool(payload.get("repeated_groups"))
+    entries = []
+    end = 0
+    for field in _sort_by_offset(payload.get("fields", [])):
+        byte_offset = field.get("byte_offset")
+        if not isinstance(byte_offset, int):
+            continue
+        spec = parse_type(field.get("data_type", "U1"))
+        size = spec.size
+        # Variable-length or overlapping fields shift everything after them
+        if size == 0 or byte_offset < end:
+            has_variable = True
+        packer = None
+        if spec.kind == "scalar":
+            packer = _STRUCTS.get(spec.base_type, _DEFAULT_STRUCT)
+        # Reserved fields are zero-filled directly when no value is supplied
+        reserved = bool(field.get("reserved")) and size <= len(_ZERO_SLAB)
+        entries.append((byte_offset, field.get("name"), spec, size, packer, reserved))
+        end = max(end, byte_offset + size)
+
+    groups = []
+    for rg in payload.get("repeated_groups", []):
+        rg_fields = tuple(
+            (field.get("byte_offset", 0), field.get("name"), parse_type(field.get("data_type", "U1")))
+            for field in _sort_by_offset(rg.get("fields", []))
+        )
+        names = tuple(name for _, name, _ in rg_fields)
+        groups.append(_Group(
+            rg, rg.get("name", "group"), rg_fields, names,
+            _instance_struct(rg, rg_fields), rg.get("group_size_bytes"),
+        ))
+
+    # Also covers the fixed part ahead of any repeated groups
+    fields_struct = _compile_struct(((entry[0], entry[2]) for entry in entries), end)
+    names = tuple(entry[1] for entry in entries)
+
+    layout = _Layout(payload, variant, tuple(entries), end, has_variable, tuple(groups), names, fields_struct)
+    _cache_put(_layout_cache, key, (message, layout))
+    return layout
+
+
+def _instance_struct(rg: dict, rg_fields: tuple) -> Optional[struct.Struct]:
+    """Build a Struct packing one repeated-group instance, padding included."""
+    group_size = rg.get("group_size_bytes")
+    if group_size and not isinstance(group_size, int):
+        return None
+    return _compile_struct(((byte_offset, spec) for byte_offset, _, spec in rg_fields), group_size)
+
+
+def _compile_struct(fields, total_size: Optional[int] = None) -> Optional[struct.Struct]:
+    """Build one Struct for (byte_offset, spec) pairs in offset order.
+
+    Gaps, and any room left before total_size, become pad bytes. Returns
+    None when a field is not a scalar or its offset is not a non-overlapping
+    int; those layouts are encoded field by field.
+    """
+    fmt = ["<"]
+    end = 0
+    for byte_offset, spec in fields:
+        if spec.kind != "scalar" or not isinstance(byte_offset, int) or byte_offset < end:
+            return None
+        if byte_offset > end:
+            fmt.append(f"{byte_offset - end}x")
+        fmt.append(DATA_TYPE_MAP.get(spec.base_type, ("B", 1))[0])
+        end = byte_offset + spec.size
+    if total_size and total_size > end:
+        fmt.append(f"{total_size - end}x")
+    return struct.Struct("".join(fmt))
+
+
 def generate_test_values(message: dict, num_repeated: int = 1, variant_name: Optional[str] = None) -> dict:
     """Generate random but valid test values for a message's fields.
 
+    Values are drawn from an RNG seeded by message name, variant and
+    num_repeated, so they are reproducible across runs, and are memoized per
+    message. Each call returns its own deep copy, safe to mutate.
+
     Args:
         message: Message definition from schema
         num_repeated: Number of repeated group instances to generate
@@ -111,6 +268,19 @@ def generate_test_values(message: dict, num_repeated: int = 1, variant_name: Opt
     Returns:
         Dict with field values and optional _repeated_groups data
     """
+    key = (id(message), num_repeated, variant_name)
+    cached = _test_values_cache.get(key)
+    if cached is not None and cached[0] is message:
+        return copy.deepcopy(cached[1])
+
+    seed = zlib.crc32(f"{message.get('name', '')}:{variant_name}:{num_repeated}".encode())
+    values = _generate_test_values(message, num_repeated, variant_name, random.Random(seed))
+    _cache_put(_test_values_cache, key, (message, values))
+    return copy.deepcopy(values)
+
+
+def _generate_test_values(message: dict, num_repeated: int, variant_name: Optional[str], rng: random.Random) -> dict:
+    """Draw fresh test values for a message from the given RNG."""
     values = {}
     payload, variant = get_message_payload(message, variant_name)
 
@@ -151,7 +321,7 @@ def generate_test_values(message: dict, num_repeated: int = 1, variant_name: Opt
             values[name] = num_repeated
             continue
         
-        values[name] = _generate_value_for_type(data_type)
+        values[name] = _generate_value_for_type(data_type, rng)
     
     # Generate repeated group values
     if repeated_groups:
@@ -159,17 +329,22 @@ def generate_test_values(message: dict, num_repeated: int = 1, variant_name: Opt
         for rg in repeated_groups:
             rg_name = rg.get("name", "group")
             rg_fields = rg.get("fields", [])
-            instances = []
-            for _ in range(num_repeated):
-                instance = {}
-                for field in rg_fields:
-                    fname = field.get("name")
-                    ftype = field.get("data_type", "U1")
-                    if field.get("reserved"):
-                        instance[fname] = _generate_zero_value(ftype)
-                    else:
-                        instance[fname] = _generate_value_for_type(ftype)
-                instances.append(instance)
+            # Draw each field's values for all instances at once, then
+            # assemble the instances row by row
+            names = [field.get("name") for field in rg_fields]
+            columns = []
+            for field in rg_fields:
+                spec = parse_type(field.get("data_type", "U1"))
+                if field.get("reserved"):
+                    columns.append([_zero_value(spec) for _ in range(num_repeated)])
+                elif spec.kind == "scalar":
+                    columns.append(_random_values(spec.base_type, num_repeated, rng))
+                else:
+                    columns.append([_random_value(spec, rng) for _ in range(num_repeated)])
+            if columns:
+                instances = [dict(zip(names, row)) for row in zip(*columns)]
+            else:
+                instances = [{} for _ in range(num_repeated)]
             values["_repeated_groups"][rg_name] = instances
     
     return values
@@ -177,188 +352,163 @@ def generate_test_values(message: dict, num_repeated: int = 1, variant_name: Opt
 
 def _generate_zero_value(data_type) -> Any:
     """Generate a zero/empty value for a data type."""
-    if isinstance(data_type, dict):
-        if "array_of" in data_type:
-            count = data_type.get("count", 1)
-            # Handle variable count (string like 'N') - use empty array
-            if not isinstance(count, int):
-                return []
-            return [0] * count
-        data_type = data_type.get("type", "U1")
-    if not isinstance(data_type, str):
+    return _zero_value(parse_type(data_type))
+
+
+def _zero_value(spec: TypeSpec) -> Any:
+    if spec.kind == "scalar":
         return 0
-    if "[" in data_type:
-        base_type = data_type.split("[")[0]
-        count = int(data_type.split("[")[1].rstrip("]"))
-        if base_type == "CH":
-            return "\x00" * count
-        return [0] * count
-    return 0
+    if spec.kind != "array":
+        return []
+    if spec.base_type == "CH":
+        return "\x00" * spec.count
+    return [0] * spec.count
 
 
-def _generate_value_for_type(data_type) -> Any:
+def _generate_value_for_type(data_type, rng: random.Random) -> Any:
     """Generate a random value for a data type (handles dict and string types)."""
-    if isinstance(data_type, dict):
-        if "array_of" in data_type:
-            base_type = data_type["array_of"]
-            # Handle nested structures - skip them
-            if isinstance(base_type, dict):
-                return []
-            count = data_type.get("count", 1)
-            # Handle variable count (string like 'N' or count_field) - use empty array
-            if not isinstance(count, int):
-                return []
-            if base_type == "CH":
-                return "A" * count
-            return [_random_value_for_type(base_type) for _ in range(count)]
-        # Handle complex element structures
-        if "elements" in data_type or "num_elements_field" in data_type:
-            return []
-        data_type = data_type.get("type", "U1")
-    if not isinstance(data_type, str):
-        return 0
-    if "[" in data_type:
-        base_type = data_type.split("[")[0]
-        count_str = data_type.split("[")[1].rstrip("]")
-        if not count_str:  # Variable length like "U1[]"
-            return []
-        try:
-            count = int(count_str)
-        except ValueError:
-            return []
-        if base_type == "CH":
-            return "A" * count
-        return [_random_value_for_type(base_type) for _ in range(count)]
-    return _random_value_for_type(data_type)
+    return _random_value(parse_type(data_type), rng)
+
 
+def _random_value(spec: TypeSpec, rng: random.Random) -> Any:
+    if spec.kind == "scalar":
+        return _random_value_for_type(spec.base_type, rng)
+    # Variable-length and nested structures get an empty array
+    if spec.kind != "array":
+        return []
+    if spec.base_type == "CH":
+        return "A" * spec.count
+    return _random_values(spec.base_type, spec.count, rng)
+
+
+def _random_values(data_type: str, count: int, rng: random.Random) -> list:
+    """Generate count random values of a scalar type.
+
+    Integer types are decoded from a single randbytes() draw, which is
+    uniform over the type's full range like randint() but one call total.
+    """
+    typecode = _INT_ARRAY_CODES.get(data_type)
+    if typecode is None:
+        return [_random_value_for_type(data_type, rng) for _ in range(count)]
+    values = array(typecode)
+    values.frombytes(rng.randbytes(values.itemsize * count))
+    return values.tolist()
 
-def _random_value_for_type(data_type: str) -> Any:
+
+def _random_value_for_type(data_type: str, rng: random.Random) -> Any:
     """Generate a random value for a given data type."""
     if data_type == "U1":
-        return random.randint(0, 255)
+        return rng.randint(0, 255)
     elif data_type == "I1":
-        return random.randint(-128, 127)
+        return rng.randint(-128, 127)
     elif data_type == "X1":
-        return random.randint(0, 255)
+        return rng.randint(0, 255)
     elif data_type == "U2":
-        return random.randint(0, 65535)
+        return rng.randint(0, 65535)
     elif data_type == "I2":
-        return random.randint(-32768, 32767)
+        return rng.randint(-32768, 32767)
     elif data_type == "X2":
-        return random.randint(0, 65535)
+        return rng.randint(0, 65535)
     elif data_type == "U4":
-        return random.randint(0, 0xFFFFFFFF)
+        return rng.randint(0, 0xFFFFFFFF)
     elif data_type == "I4":
-        return random.randint(-0x80000000, 0x7FFFFFFF)
+        return rng.randint(-0x80000000, 0x7FFFFFFF)
     elif data_type == "X4":
-        return random.randint(0, 0xFFFFFFFF)
+        return rng.randint(0, 0xFFFFFFFF)
     elif data_type == "R4":
-        return random.uniform(-1000.0, 1000.0)
+        return rng.uniform(-1000.0, 1000.0)
     elif data_type == "R8":
-        return random.uniform(-1000000.0, 1000000.0)
+        return rng.uniform(-1000000.0, 1000000.0)
     elif data_type == "CH":
-        return chr(random.randint(65, 90))  # A-Z
+        return chr(rng.randint(65, 90))  # A-Z
     else:
         return 0
 
 
 def encode_field(value: Any, data_type) -> bytes:
     """Encode a single field value to bytes."""
-    # Handle data_type being a dict (e.g., array_of definitions)
-    if isinstance(data_type, dict):
-        if "array_of" in data_type:
-            base_type = data_type["array_of"]
-            # Handle nested structures - can't encode them, return empty
-            if isinstance(base_type, dict):
-                return b""
-            count = data_type.get("count", 1)
-            # Handle variable count (string like 'N' or count_field) - encode actual values provided
-            if not isinstance(count, int):
-                if isinstance(value, (list, tuple)):
-                    count = len(value)
-                elif isinstance(value, str):
-                    count = len(value)
-                else:
-                    return b""  # No data for variable-length with no value
-            if base_type == "CH":
-                if isinstance(value, str):
-                    encoded = value.encode("ascii", errors="replace")
-                    return encoded[:count].ljust(count, b"\x00")
-                return b"\x00" * count
-            else:
-                fmt, size = DATA_TYPE_MAP.get(base_type, ("B", 1))
-                result = b""
-                if isinstance(value, (list, tuple)):
-                    for i in range(count):
-                        v = value[i] if i < len(value) else 0
-                        result += struct.pack(f"<{fmt}", v)
-                else:
-                    result = b"\x00" * (size * count)
-                return result
-        # Handle complex element structures
-        if "elements" in data_type or "num_elements_field" in data_type:
-            return b""
-        data_type = data_type.get("type", "U1")
-    
-    if not isinstance(data_type, str):
-        data_type = "U1"  # Fallback
-    
-    # Handle array types
-    if "[" in data_type:
-        base_type = data_type.split("[")[0]
-        count_str = data_type.split("[")[1].rstrip("]")
-
-        # Handle variable-length arrays like "U1[]"
-        if not count_str:
-            if isinstance(value, (list, tuple)):
-                count = len(value)
-            elif isinstance(value, str):
-                count = len(value)
-            else:
-                return b""
-        else:
-            try:
-                count = int(count_str)
-            except ValueError:
-                # Variable count like "U1[N]"
-                if isinstance(value, (list, tuple)):
-                    count = len(value)
-                else:
-                    return b""
-
-        if base_type == "CH":
-            # String/character array
-            if isinstance(value, str):
-                encoded = value.encode("ascii", errors="replace")
-                # Pad or truncate to exact size
-                return encoded[:count].ljust(count, b"\x00")
-            return b"\x00" * count
+    return _encode_value(value, parse_type(data_type))
+
+
+def _encode_value(value: Any, spec: TypeSpec) -> bytes:
+    kind = spec.kind
+    if kind == "scalar":
+        packer = _STRUCTS.get(spec.base_type, _DEFAULT_STRUCT)
+        try:
+            return packer.pack(value)
+        except struct.error:
+            return bytes(packer.size)
+    if kind == "opaque":
+        return b""
+
+    count = spec.count
+    if kind == "variable":
+        # Encode the actual values provided
+        if isinstance(value, (list, tuple, str)):
+            count = len(value)
         else:
-            # Numeric array
-            fmt, size = DATA_TYPE_MAP.get(base_type, ("B", 1))
-            result = b""
-            if isinstance(value, (list, tuple)):
-                for i in range(count):
-                    v = value[i] if i < len(value) else 0
-                    result += struct.pack(f"<{fmt}", v)
-            else:
-                result = b"\x00" * (size * count)
-            return result
-    
-    # Single value
-    fmt, size = DATA_TYPE_MAP.get(data_type, ("B", 1))
-    try:
-        return struct.pack(f"<{fmt}", value)
-    except struct.error:
-        return b"\x00" * size
+            return b""  # No data for variable-length with no value
+
+    if spec.base_type == "CH":
+        # String/character array, padded or truncated to exact size
+        if isinstance(value, str):
+            return _pack_ch(value, count)
+        return bytes(count)
+    return _encode_numeric_array(value, spec.base_type, count)
+
+
+def _pack_ch(value: str, count: int) -> bytes:
+    """Encode a string as exactly count ASCII bytes, NUL-padded or truncated."""
+    # "replace" maps every character to one byte, so truncate before encoding;
+    # ljust returns the encoded bytes as-is when no padding is needed
+    return value[:count].encode("ascii", errors="replace").ljust(count, b"\x00")
+
+
+def _encode_numeric_array(value: Any, base_type: str, count: int) -> bytes:
+    """Encode a numeric array, zero-padded or truncated to count elements."""
+    size = _STRUCTS.get(base_type, _DEFAULT_STRUCT).size
+    if not isinstance(value, (list, tuple)):
+        return bytes(size * count)
+
+    typecode = _BYTE_ARRAY_CODES.get(base_type)
+    if typecode is not None:
+        # Single-byte elements: one C-level conversion instead of a pack per byte
+        try:
+            packed = array(typecode, value[:count])
+        except (OverflowError, TypeError) as e:
+            raise struct.error(str(e)) from e
+        if len(packed) < count:
+            packed.frombytes(bytes(count - len(packed)))
+        return packed.tobytes()
+
+    # Pack the whole array in one call, padding missing elements with zeros
+    items = value[:count]
+    if len(items) < count:
+        items = (*items, *(0,) * (count - len(items)))
+    return array_struct(base_type, count).pack(*items)
+
+
+def _message_ids(message: dict) -> tuple[int, int]:
+    """Class and message IDs of a message as ints."""
+    ids = get_message_ids(message)
+    if ids is None:
+        # Message dict not loaded through load_schema: parse the ids on every
+        # call, since the caller may change them between calls
+        return parse_hex_id(message.get("class_id", 0)), parse_hex_id(message.get("message_id", 0))
+    return ids
 
 
 def generate_ubx_message(message: dict, field_values: Optional[dict] = None, variant_name: Optional[str] = None) -> bytes:
     """Generate a complete UBX binary message from schema and field values.
 
+    The message's field layout is computed on first use and cached; after
+    editing a message dict that has been encoded, call clear_caches().
+
     Args:
         message: Message definition from schema
         field_values: Optional dict of field name -> value. Missing fields use defaults.
+            Repeated-group instances under "_repeated_groups" may be dicts or
+            tuples of values in the group's byte_offset order.
         variant_name: Optional variant name for multi-variant messages
 
     Returns:
@@ -368,11 +518,11 @@ def generate_ubx_message(message: dict, field_values: Optional[dict] = None, var
         field_values = generate_test_values(message, variant_name=variant_name)
 
     # Get class and message IDs
-    class_id = parse_hex_id(message.get("class_id", 0))
-    msg_id = parse_hex_id(message.get("message_id", 0))
+    class_id, msg_id = _message_ids(message)
 
     # Get payload definition (handles variants)
-    payload, variant = get_message_payload(message, variant_name)
+    layout = _prepare(message, variant_name)
+    variant = layout.variant
 
     # If generating a variant, ensure discriminator value is set
     if variant and "discriminator" in variant:
@@ -380,50 +530,47 @@ def generate_ubx_message(message: dict, field_values: Optional[dict] = None, var
         if "field" in disc and "value" in disc:
             if disc["field"] not in field_values:
                 field_values[disc["field"]] = disc["value"]
-    fields = payload.get("fields", [])
-    
-    # Sort fields by byte_offset to ensure correct order
-    # Handle fields with None or non-integer byte_offsets by putting them at the end
-    def get_sort_key(f):
-        offset = f.get("byte_offset")
-        if isinstance(offset, int):
-            return (0, offset)  # Integer offsets first, sorted by value
-        return (1, 0)  # Non-integer offsets (None, strings) at the end
-    sorted_fields = sorted(fields, key=get_sort_key)
-    
-    # Build payload bytes
-    payload_bytes = bytearray()
-    current_offset = 0
-    
-    for field in sorted_fields:
-        name = field.get("name")
-        data_type = field.get("data_type", "U1")
-        byte_offset = field.get("byte_offset")
 
-        # Skip fields with non-integer byte_offsets (variable position fields)
-        if not isinstance(byte_offset, int):
-            continue
+    if not layout.has_variable:
+        return _generate_fixed_frame(layout, class_id, msg_id, field_values)
 
-        # Pad if there's a gap
-        if byte_offset > current_offset:
-            payload_bytes.extend(b"\x00" * (byte_offset - current_offset))
-            current_offset = byte_offset
-        
-        # Get value (use provided or default to 0)
-        value = field_values.get(name, 0)
-        
-        # Encode field
-        encoded = encode_field(value, data_type)
-        payload_bytes.extend(encoded)
-        current_offset += len(encoded)
+    # The payload is built straight into the frame, after a 6-byte header
+    # that is filled in once the payload length is known
+    frame = bytearray(6)
+    current_offset = 0
+
+    fields_struct = layout.fields_struct
+    if fields_struct is not None:
+        frame.extend(bytes(fields_struct.size))
+        try:
+            fields_struct.pack_into(frame, 6, *[field_values.get(name, 0) for name in layout.field_names])
+            current_offset = fields_struct.size
+        except struct.error:
+            del frame[6:]  # Field-by-field encoding below zero-fills the bad values
+    
+    if not current_offset:
+        for byte_offset, name, spec, size, _, reserved in layout.fields:
+            # Pad if there's a gap
+            if byte_offset > current_offset:
+                frame.extend(bytes(byte_offset - current_offset))
+                current_offset = byte_offset
+
+            # Get value (use provided or default to 0)
+            value = field_values.get(name, 0)
+
+            # Encode field
+            if reserved and not value:
+                frame.extend(_ZERO_SLAB[:size])
+                current_offset += size
+                continue
+            encoded = _encode_value(value, spec)
+            frame.extend(encoded)
+            current_offset += len(encoded)
     
     # Encode repeated groups
-    repeated_groups = payload.get("repeated_groups", [])
     rg_values = field_values.get("_repeated_groups", {})
     
-    for rg in repeated_groups:
-        rg_name = rg.get("name", "group")
-        rg_fields = rg.get("fields", [])
+    for rg, rg_name, rg_fields, rg_names, instance_struct, group_size in layout.groups:
         base_offset = rg.get("base_offset", current_offset)
         
         # Handle dynamic base_offset (v1.3 format)
@@ -442,55 +589,233 @@ def generate_ubx_message(message: dict, field_values: Optional[dict] = None, var
         
         # Pad to base_offset if needed
         if base_offset > current_offset:
-            payload_bytes.extend(b"\x00" * (base_offset - current_offset))
+            frame.extend(bytes(base_offset - current_offset))
             current_offset = base_offset
         
         # Get instances for this group
         instances = rg_values.get(rg_name, [])
         
         for instance in instances:
-            # Sort fields by byte_offset within the group
-            def get_rg_sort_key(f):
-                offset = f.get("byte_offset")
-                if isinstance(offset, int):
-                    return (0, offset)
-                return (1, 0)
-            sorted_rg_fields = sorted(rg_fields, key=get_rg_sort_key)
+            if instance_struct is not None:
+                if isinstance(instance, tuple):
+                    values = instance
+                else:
+                    values = [instance.get(fname, 0) for fname in rg_names]
+                try:
+                    frame += instance_struct.pack(*values)
+                    current_offset += instance_struct.size
+                    continue
+                except struct.error:
+                    pass  # Field-by-field encoding zero-fills the bad values
+            if isinstance(instance, tuple):
+                instance = dict(zip(rg_names, instance))
+
             group_start = current_offset
             
-            for field in sorted_rg_fields:
-                fname = field.get("name")
-                ftype = field.get("data_type", "U1")
-                foffset = field.get("byte_offset", 0)
-                
+            # Fields are already sorted by byte_offset within the group
+            for foffset, fname, spec in rg_fields:
                 # Absolute offset within this instance
                 abs_offset = group_start + foffset
                 if abs_offset > current_offset:
-                    payload_bytes.extend(b"\x00" * (abs_offset - current_offset))
+                    frame.extend(bytes(abs_offset - current_offset))
                     current_offset = abs_offset
                 
                 value = instance.get(fname, 0)
-                encoded = encode_field(value, ftype)
-                payload_bytes.extend(encoded)
+                encoded = _encode_value(value, spec)
+                frame.extend(encoded)
                 current_offset += len(encoded)
             
             # Pad to group_size_bytes if specified
-            group_size = rg.get("group_size_bytes")
             if group_size:
                 expected_end = group_start + group_size
                 if current_offset < expected_end:
-                    payload_bytes.extend(b"\x00" * (expected_end - current_offset))
+                    frame.extend(bytes(expected_end - current_offset))
                     current_offset = expected_end
     
-    # Build message
-    payload_len = len(payload_bytes)
-    
-    # Header: class, id, length (little-endian)
-    header = bytes([class_id, msg_id]) + struct.pack("<H", payload_len)
-    
+    # Header: sync + class + id + payload length
+    frame[0] = SYNC_CHAR_1
+    frame[1] = SYNC_CHAR_2
+    frame[2] = class_id
+    frame[3] = msg_id
+    _PAYLOAD_LEN.pack_into(frame, 4, len(frame) - 6)
+
     # Calculate checksum over class, id, length, and payload
-    checksum_data = header + bytes(payload_bytes)
-    ck_a, ck_b = calculate_checksum(checksum_data)
-    
-    # Complete message
-    return bytes([SYNC_CHAR_1, SYNC_CHAR_2]) + checksum_data + bytes([ck_a, ck_b])
+    frame += bytes(calculate_checksum(memoryview(frame)[2:]))
+    return bytes(frame)
+
+
+def _generate_fixed_frame(layout: _Layout, class_id: int, msg_id: int, field_values: dict) -> bytes:
+    """Pack a fixed-layout message straight into a preallocated frame buffer."""
+    payload_size = layout.payload_size
+    frame = bytearray(6 + payload_size + 2)
+    frame[0] = SYNC_CHAR_1
+    frame[1] = SYNC_CHAR_2
+    frame[2] = class_id
+    frame[3] = msg_id
+    _PAYLOAD_LEN.pack_into(frame, 4, payload_size)
+
+    packed = False
+    fields_struct = layout.fields_struct
+    if fields_struct is not None:
+        try:
+            fields_struct.pack_into(frame, 6, *[field_values.get(name, 0) for name in layout.field_names])
+            packed = True
+        except struct.error:
+            # Some value doesn't fit its field: clear any partial write and
+            # pack field by field, which leaves just that field zero
+            frame[6:-2] = bytes(payload_size)
+
+    if not packed:
+        for byte_offset, name, spec, size, packer, reserved in layout.fields:
+            value = field_values.get(name, 0)
+            if reserved and not value:
+                continue  # Frame buffer is already zeroed
+            pos = 6 + byte_offset
+            if packer is not None:
+                try:
+                    packer.pack_into(frame, pos, value)
+                except struct.error:
+                    pass  # Unencodable values stay zero, as in encode_field
+            else:
+                frame[pos:pos + size] = _encode_value(value, spec)
+
+    # Checksum covers class, id, length, and payload
+    frame[-2], frame[-1] = calculate_checksum(memoryview(frame)[2:-2])
+    return bytes(frame)
+
+
+def compile_encoder(message: dict, variant_name: Optional[str] = None):
+    """Build a function encoding a message, specialized to its layout.
+
+    The returned encode(field_values=None) gives the same bytes as
+    generate_ubx_message(message, field_values, variant_name). For fixed
+    payloads of scalar fields it is generated code with the field names
+    and frame header baked in; other layouts call generate_ubx_message.
+    Encoders are cached per message and variant, so changes made to the
+    message dict after its first use are not picked up until clear_caches().
+
+    Example:
+        encode = compile_encoder(get_message_by_name("UBX-NAV-PVT"))
+        frame = encode({"iTOW": 1000, "numSV": 12})
+    """
+    key = (id(message), variant_name)
+    cached = _encoder_cache.get(key)
+    if cached is not None and cached[0] is message:
+        return cached[1]
+
+    layout = _prepare(message, variant_name)
+    if layout.has_variable or layout.fields_struct is None:
+        encoder = partial(generate_ubx_message, message, variant_name=variant_name)
+    else:
+        encoder = _generate_encoder(message, variant_name, layout)
+    _cache_put(_encoder_cache, key, (message, encoder))
+    return encoder
+
+
+def _generate_encoder(message: dict, variant_name: Optional[str], layout: _Layout):
+    """exec the specialized encoder for a fixed, all-scalar layout."""
+    class_id, msg_id = _message_ids(message)
+    template = bytearray(6 + layout.payload_size + 2)
+    template[0:4] = bytes((SYNC_CHAR_1, SYNC_CHAR_2, class_id, msg_id))
+    _PAYLOAD_LEN.pack_into(template, 4, layout.payload_size)
+
+    namespace = {
+        "message": message,
+        "variant_name": variant_name,
+        "layout": layout,
+        "class_id": class_id,
+        "msg_id": msg_id,
+        "template": bytes(template),
+        "pack_into": layout.fields_struct.pack_into,
+        "struct_error": struct.error,
+        "fletcher": fletcher,
+        "generate_test_values": generate_test_values,
+        "generate_fixed_frame": _generate_fixed_frame,
+    }
+
+    discriminator = ""
+    disc = (layout.variant or {}).get("discriminator", {})
+    if "field" in disc and "value" in disc:
+        discriminator = _DISCRIMINATOR_SOURCE
+        namespace["disc_field"] = disc["field"]
+        namespace["disc_value"] = disc["value"]
+
+    args = "".join(f"field_values.get({name!r}, 0), " for name in layout.field_names)
+    source = _ENCODER_SOURCE.format(discriminator=discriminator, args=args)
+    exec(compile(source, f"<ubx encoder {message.get('name', '?')}>", "exec"), namespace)
+    return namespace["encode"]
+
+
+# Batches smaller than this run in-process when workers isn't given: pool
+# start-up and the schema snapshot cost more than encoding them serially
+_BATCH_SERIAL_THRESHOLD = 4096
+
+
+def generate_ubx_batch(
+    messages,
+    field_values=None,
+    variant_name: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+) -> list[bytes]:
+    """Generate many UBX messages across worker processes.
+
+    Args:
+        messages: Iterable of message definitions
+        field_values: Optional iterable of field value dicts (or None for
+            test values), one per message
+        variant_name: Optional variant name applied to every message
+        workers: Number of worker processes (default: CPU count, or in this
+            process for batches under _BATCH_SERIAL_THRESHOLD); 1 runs in
+            this process
+        chunksize: Messages sent to a worker at a time
+
+    Returns:
+        The encoded messages, in input order, as generate_ubx_message
+        would return them.
+
+    Raises:
+        ValueError: If field_values and messages differ in length.
+
+    Unlike generate_ubx_message, the caller's field_values dicts are never
+    modified (variant discriminators are added to a copy), whichever way
+    the batch runs.
+
+    Workers load the schema from a snapshot instead of parsing the JSON
+    again. Schema messages are sent by name and looked up in the worker, so
+    its layout caches are reused across the batch.
+    """
+    messages = list(messages)
+    if field_values is None:
+        field_values = [None] * len(messages)
+    items = [
+        (_batch_ref(message), values, variant_name)
+        for message, values in zip(messages, field_values, strict=True)
+    ]
+
+    if workers == 1 or (workers is None and len(items) < _BATCH_SERIAL_THRESHOLD):
+        return [_generate_batch_item(item) for item in items]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = dump_schema_snapshot(os.path.join(tmp, "schema.pickle"))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=load_schema_snapshot, initargs=(snapshot,)
+        ) as pool:
+            return list(pool.map(_generate_batch_item, items, chunksize=chunksize))
+
+
+def _batch_ref(message: dict):
+    """Name of a schema message, or the message itself if not from the schema."""
+    name = message.get("name")
+    if name is not None and get_message_by_name(name) is message:
+        return name
+    return message
+
+
+def _generate_batch_item(item) -> bytes:
+    """Worker entry point for generate_ubx_batch."""
+    ref, values, variant_name = item
+    message = get_message_by_name(ref) if isinstance(ref, str) else ref
+    if values is not None:
+        values = dict(values)  # Keep the discriminator out of the caller's dict
+    return generate_ubx_message(message, values, variant_name)
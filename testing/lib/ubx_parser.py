@@ -1,30 +1,59 @@
 """Parse UBX binary messages using schema definitions."""
 
+import re
 import struct
-from typing import Any, Optional
+import sys
+from array import array
+from operator import itemgetter
+from typing import Any, NamedTuple, Optional
 
+from ._ubx_native import fletcher
 from .schema_loader import get_message_by_ids, parse_hex_id, select_variant_by_payload
+from .ubx_types import DATA_TYPE_MAP, TypeSpec, array_struct, parse_type
 
 # UBX sync characters
 SYNC_CHAR_1 = 0xB5
 SYNC_CHAR_2 = 0x62
+_SYNC = bytes((SYNC_CHAR_1, SYNC_CHAR_2))
 
-# Data type to struct format and size
-DATA_TYPE_MAP = {
-    "U1": ("B", 1),
-    "I1": ("b", 1),
-    "X1": ("B", 1),
-    "U2": ("H", 2),
-    "I2": ("h", 2),
-    "X2": ("H", 2),
-    "U4": ("I", 4),
-    "I4": ("i", 4),
-    "X4": ("I", 4),
-    "R4": ("f", 4),
-    "R8": ("d", 8),
-    "CH": ("c", 1),
+# Searches any bytes-like object, unlike bytes.find which memoryview lacks
+_SYNC_PATTERN = re.compile(re.escape(_SYNC))
+
+# Compiled little-endian Struct per data type; unknown types decode as U1
+_STRUCTS = {name: struct.Struct(f"<{fmt}") for name, (fmt, _) in DATA_TYPE_MAP.items()}
+_DEFAULT_STRUCT = _STRUCTS["U1"]
+
+# Little-endian payload length in the frame header
+_PAYLOAD_LEN = struct.Struct("<H")
+
+# array typecodes for numeric types whose array item size matches the wire size
+_ARRAY_CODES = {
+    name: fmt for name, (fmt, size) in DATA_TYPE_MAP.items()
+    if name != "CH" and array(fmt).itemsize == size
 }
 
+# array.frombytes loads native byte order; UBX is little-endian
+_BYTESWAP = sys.byteorder == "big"
+
+
+class _DecodePlan(NamedTuple):
+    """Precomputed decoding of one payload layout."""
+    fields: tuple  # (byte_offset, name, spec) with integer offsets, sorted by offset
+    unpacker: Optional[struct.Struct]  # Decodes every field in one call, None if they can't be
+    names: tuple  # Field name for each unpacked value
+    ch_runs: tuple  # (start, end, ((value_index, lo, hi), ...)) per run of adjacent CH strings
+    size: int  # Payload bytes the unpacker reads
+
+
+# Plans keyed by (id(message_def), variant_name). The message itself is kept in
+# the entry so a recycled id can never hand back a stale plan.
+_plan_cache: dict[tuple[int, Optional[str]], tuple[dict, _DecodePlan]] = {}
+
+# Variant lookup tables keyed by id(message_def), kept the same way: either
+# (byte_offset, {discriminator value: variant}) or None when the variants
+# aren't all told apart by one byte
+_variant_tables: dict[int, tuple[dict, Optional[tuple[int, dict]]]] = {}
+
 
 class UBXParseError(Exception):
     """Exception raised when parsing fails."""
@@ -36,104 +65,100 @@ def verify_checksum(data: bytes) -> bool:
     if len(data) < 2:
         return False
     
-    ck_a = 0
-    ck_b = 0
-    for byte in data[:-2]:  # Exclude checksum bytes
-        ck_a = (ck_a + byte) & 0xFF
-        ck_b = (ck_b + ck_a) & 0xFF
-    
+    # Exclude checksum bytes, without copying the data to do so
+    ck_a, ck_b = fletcher(memoryview(data)[:-2])
     return ck_a == data[-2] and ck_b == data[-1]
 
 
-def decode_field(data: bytes, offset: int, data_type) -> tuple[Any, int]:
+def decode_field(data: bytes, offset: int, data_type, array_values: bool = False) -> tuple[Any, int]:
     """Decode a single field from bytes.
 
+    Numeric arrays decode to a list, or to an array.array when
+    array_values is set.
+
     Returns:
         Tuple of (value, bytes_consumed)
     """
-    # Handle data_type being a dict
-    if isinstance(data_type, dict):
-        if "array_of" in data_type:
-            base_type = data_type["array_of"]
-            # Handle nested structures - can't decode them
-            if isinstance(base_type, dict):
-                return [], 0
-            count = data_type.get("count", 1)
-            # Handle variable count
-            if not isinstance(count, int):
-                return [], 0
-            if base_type == "CH":
-                end = offset + count
-                if end > len(data):
-                    end = len(data)
-                raw = data[offset:end]
-                value = raw.decode("ascii", errors="replace").rstrip("\x00")
-                return value, count
-            else:
-                fmt, size = DATA_TYPE_MAP.get(base_type, ("B", 1))
-                values = []
-                for i in range(count):
-                    pos = offset + i * size
-                    if pos + size <= len(data):
-                        values.append(struct.unpack_from(f"<{fmt}", data, pos)[0])
-                    else:
-                        values.append(0)
-                return values, size * count
-        # Handle complex element structures
-        if "elements" in data_type or "num_elements_field" in data_type:
-            return [], 0
-        data_type = data_type.get("type", "U1")
-    if not isinstance(data_type, str):
-        data_type = "U1"
-
-    # Handle array types
-    if "[" in data_type:
-        base_type = data_type.split("[")[0]
-        count_str = data_type.split("[")[1].rstrip("]")
-        # Handle variable-length arrays like "U1[]"
-        if not count_str:
-            return [], 0
-        try:
-            count = int(count_str)
-        except ValueError:
-            return [], 0
-        
-        if base_type == "CH":
-            # String/character array
-            end = offset + count
-            if end > len(data):
-                end = len(data)
-            raw = data[offset:end]
-            # Decode and strip null bytes
-            value = raw.decode("ascii", errors="replace").rstrip("\x00")
-            return value, count
+    return _decode_value(data, offset, parse_type(data_type), array_values)
+
+
+def _decode_value(data: bytes, offset: int, spec: TypeSpec, array_values: bool = False) -> tuple[Any, int]:
+    kind = spec.kind
+    if kind == "scalar":
+        if spec.size == 1 and spec.base_type != "CH":
+            # Indexing a byte buffer yields the unsigned value directly
+            if offset >= len(data):
+                return 0, 1
+            value = data[offset]
+            if spec.base_type == "I1" and value > 0x7F:
+                value -= 0x100
+            return value, 1
+        unpacker = _STRUCTS.get(spec.base_type, _DEFAULT_STRUCT)
+        size = unpacker.size
+        if offset + size > len(data):
+            return 0, size
+        return unpacker.unpack_from(data, offset)[0], size
+
+    # Variable-length and nested structures can't be decoded on their own
+    if kind != "array":
+        return [], 0
+
+    count = spec.count
+    if spec.base_type == "CH":
+        # String/character array
+        end = offset + count
+        if end > len(data):
+            end = len(data)
+        # Decode (from any buffer, including a memoryview) and strip null bytes
+        value = str(data[offset:end], "ascii", "replace").rstrip("\x00")
+        return value, count
+
+    code = _ARRAY_CODES.get(spec.base_type) if array_values else None
+    if code is not None:
+        return _decode_array(data, offset, code, count), spec.size
+
+    # Numeric array: one unpack for the whole array when it fits
+    if count > 0:
+        unpacker = array_struct(spec.base_type, count)
+        if offset + unpacker.size <= len(data):
+            return list(unpacker.unpack_from(data, offset)), unpacker.size
+
+    # Array running past the end of the data: missing elements read as 0
+    unpacker = _STRUCTS.get(spec.base_type, _DEFAULT_STRUCT)
+    size = unpacker.size
+    values = []
+    for i in range(count):
+        pos = offset + i * size
+        if pos + size <= len(data):
+            values.append(unpacker.unpack_from(data, pos)[0])
         else:
-            # Numeric array
-            fmt, size = DATA_TYPE_MAP.get(base_type, ("B", 1))
-            values = []
-            for i in range(count):
-                pos = offset + i * size
-                if pos + size <= len(data):
-                    values.append(struct.unpack_from(f"<{fmt}", data, pos)[0])
-                else:
-                    values.append(0)
-            return values, size * count
-    
-    # Single value
-    fmt, size = DATA_TYPE_MAP.get(data_type, ("B", 1))
-    if offset + size > len(data):
-        return 0, size
-    
-    value = struct.unpack_from(f"<{fmt}", data, offset)[0]
-    return value, size
+            values.append(0)
+    return values, size * count
 
 
-def parse_ubx_message(data: bytes, message_def: Optional[dict] = None) -> dict:
+def _decode_array(data, offset: int, code: str, count: int) -> array:
+    """Bulk-load count little-endian elements into an array.array."""
+    values = array(code)
+    itemsize = values.itemsize
+    available = max(0, min(count, (len(data) - offset) // itemsize))
+    if available:
+        values.frombytes(data[offset:offset + available * itemsize])
+        if _BYTESWAP:
+            values.byteswap()
+    # Elements running past the end of the data read as 0
+    if available < count:
+        values.extend([0] * (count - available))
+    return values
+
+
+def parse_ubx_message(data: bytes, message_def: Optional[dict] = None, array_values: bool = False) -> dict:
     """Parse a UBX binary message using schema definition.
     
     Args:
         data: Raw UBX message bytes (including sync chars and checksum)
         message_def: Optional message definition. If None, will look up by class/id.
+        array_values: Return numeric array fields as array.array rather than
+            list, loading them in bulk without a Python int per element.
     
     Returns:
         Dict with parsed message info and field values
@@ -146,27 +171,36 @@ def parse_ubx_message(data: bytes, message_def: Optional[dict] = None) -> dict:
         raise UBXParseError(f"Message too short: {len(data)} bytes")
     
     # Check sync characters
-    if data[0] != SYNC_CHAR_1 or data[1] != SYNC_CHAR_2:
+    if data[:2] != _SYNC:
         raise UBXParseError(f"Invalid sync characters: {data[0]:02X} {data[1]:02X}")
     
     # Extract header
     class_id = data[2]
     msg_id = data[3]
-    payload_len = struct.unpack_from("<H", data, 4)[0]
+    payload_len = _PAYLOAD_LEN.unpack_from(data, 4)[0]
     
     # Validate length
     expected_len = 6 + payload_len + 2  # header + payload + checksum
     if len(data) < expected_len:
         raise UBXParseError(f"Message truncated: expected {expected_len}, got {len(data)}")
     
-    # Verify checksum
-    checksum_data = data[2:6 + payload_len + 2]  # class through checksum
-    if not verify_checksum(checksum_data):
-        raise UBXParseError("Checksum verification failed")
-    
-    # Extract payload
-    payload = data[6:6 + payload_len]
-    
+    # Slice through memoryviews so the checksum and payload aren't copied.
+    # All of them are released on the way out, so a bytearray passed in can
+    # be resized afterwards, even while a raised error is still referenced.
+    with (
+        memoryview(data) as view,
+        view[2:expected_len] as checksum_data,  # class through checksum
+        view[6:6 + payload_len] as payload,
+    ):
+        if not verify_checksum(checksum_data):
+            raise UBXParseError("Checksum verification failed")
+        return _parse_payload(payload, class_id, msg_id, message_def, array_values)
+
+
+def _parse_payload(payload, class_id: int, msg_id: int, message_def: Optional[dict], array_values: bool) -> dict:
+    """Decode a checksummed payload into parse_ubx_message's result dict."""
+    payload_len = len(payload)
+
     # Look up message definition if not provided
     if message_def is None:
         message_def = get_message_by_ids(class_id, msg_id)
@@ -189,7 +223,12 @@ def parse_ubx_message(data: bytes, message_def: Optional[dict] = None) -> dict:
     payload_source = message_def.get("payload", {})
 
     if "variants" in message_def:
-        variant = select_variant_by_payload(message_def, payload)
+        table = _variant_table(message_def)
+        if table is None:
+            variant = select_variant_by_payload(message_def, payload)
+        else:
+            disc_offset, by_value = table
+            variant = by_value.get(payload[disc_offset]) if disc_offset < len(payload) else None
         if variant:
             variant_name = variant.get("name")
             payload_source = variant.get("payload", {})
@@ -207,31 +246,21 @@ def parse_ubx_message(data: bytes, message_def: Optional[dict] = None) -> dict:
             }
 
     # Parse fields according to schema
-    fields_def = payload_source.get("fields", [])
-    # Handle fields with None or non-integer byte_offsets by putting them at the end
-    def get_sort_key(f):
-        offset = f.get("byte_offset")
-        if isinstance(offset, int):
-            return (0, offset)  # Integer offsets first, sorted by value
-        return (1, 0)  # Non-integer offsets (None, strings) at the end
-    sorted_fields = sorted(fields_def, key=get_sort_key)
-    
-    parsed_fields = {}
-    for field_def in sorted_fields:
-        name = field_def.get("name")
-        data_type = field_def.get("data_type", "U1")
-        byte_offset = field_def.get("byte_offset")
-
-        # Skip fields with non-integer byte_offsets (variable position fields)
-        if not isinstance(byte_offset, int):
-            continue
-
-        if byte_offset >= len(payload):
-            # Field beyond payload (variable length message)
-            continue
-
-        value, _ = decode_field(payload, byte_offset, data_type)
-        parsed_fields[name] = value
+    plan = _decode_plan(message_def, variant_name, payload_source)
+    if plan.unpacker is not None and len(payload) >= plan.size:
+        values = plan.unpacker.unpack_from(payload)
+        if plan.ch_runs:
+            # The unpacker skips CH strings; decode each adjacent run in one
+            # go and slice it. Every byte decodes to exactly one character
+            # (U+FFFD if not ASCII), so byte offsets are string offsets.
+            values = list(values)
+            for start, end, members in plan.ch_runs:
+                region = str(payload[start:end], "ascii", "replace")
+                for index, lo, hi in members:
+                    values.insert(index, region[lo:hi].rstrip("\x00"))
+        parsed_fields = dict(zip(plan.names, values))
+    else:
+        parsed_fields = _decode_fields(payload, plan.fields, array_values)
 
     result = {
         "class_id": class_id,
@@ -251,6 +280,104 @@ def parse_ubx_message(data: bytes, message_def: Optional[dict] = None) -> dict:
     return result
 
 
+def _decode_fields(payload, fields: tuple, array_values: bool = False) -> dict:
+    """Decode sorted (byte_offset, name, spec) fields one at a time."""
+    payload_size = len(payload)
+    # Fields beyond the payload (variable length message) are left out
+    return {
+        name: _decode_value(payload, byte_offset, spec, array_values)[0]
+        for byte_offset, name, spec in fields
+        if byte_offset < payload_size
+    }
+
+
+def _decode_plan(message_def: dict, variant_name: Optional[str], payload_source: dict) -> _DecodePlan:
+    """Build (once) the decoding plan for a payload layout.
+
+    Fields are sorted by byte_offset (stably, so fields sharing an offset
+    keep schema order) and those without an integer offset are dropped.
+    Layouts whose fields are all scalars or CH strings at non-overlapping
+    offsets also get a single Struct decoding the whole payload, with
+    adjacent CH strings grouped into runs decoded as one string.
+    """
+    key = (id(message_def), variant_name)
+    cached = _plan_cache.get(key)
+    if cached is not None and cached[0] is message_def:
+        return cached[1]
+
+    fields = [
+        (field_def["byte_offset"], field_def.get("name"), parse_type(field_def.get("data_type", "U1")))
+        for field_def in payload_source.get("fields", [])
+        if isinstance(field_def.get("byte_offset"), int)
+    ]
+    fields.sort(key=itemgetter(0))
+    fields = tuple(fields)
+
+    unpacker = None
+    fmt = ["<"]
+    ch_runs = []
+    end = 0
+    for index, (byte_offset, _, spec) in enumerate(fields):
+        if spec.size == 0 or byte_offset < end:
+            break
+        if spec.kind == "scalar":
+            code = DATA_TYPE_MAP.get(spec.base_type, ("B", 1))[0]
+        elif spec.kind == "array" and spec.base_type == "CH":
+            code = f"{spec.count}x"
+            # Extend the previous run if this string directly follows it
+            if ch_runs and ch_runs[-1][1] == byte_offset:
+                start, _, members = ch_runs.pop()
+            else:
+                start, members = byte_offset, []
+            members.append((index, byte_offset - start, byte_offset - start + spec.count))
+            ch_runs.append((start, byte_offset + spec.count, members))
+        else:
+            break
+        if byte_offset > end:
+            fmt.append(f"{byte_offset - end}x")
+        fmt.append(code)
+        end = byte_offset + spec.size
+    else:
+        if fields:
+            unpacker = struct.Struct("".join(fmt))
+
+    ch_runs = tuple((start, run_end, tuple(members)) for start, run_end, members in ch_runs)
+    plan = _DecodePlan(fields, unpacker, tuple(name for _, name, _ in fields), ch_runs, end)
+    _plan_cache[key] = (message_def, plan)
+    return plan
+
+
+def _variant_table(message_def: dict) -> Optional[tuple[int, dict]]:
+    """Build (once) a discriminator-byte lookup for a message's variants.
+
+    Applies when every variant is selected by the value of the byte at one
+    shared offset; selection is then a single dict lookup, with the first
+    variant winning for a repeated value as in select_variant_by_payload.
+    """
+    key = id(message_def)
+    cached = _variant_tables.get(key)
+    if cached is not None and cached[0] is message_def:
+        return cached[1]
+
+    table = None
+    offsets = set()
+    by_value = {}
+    for variant in message_def.get("variants", []):
+        disc = variant.get("discriminator", {})
+        if set(disc) != {"field", "byte_offset", "value"} or not isinstance(disc["value"], int):
+            break
+        offsets.add(disc["byte_offset"])
+        by_value.setdefault(disc["value"], variant)
+    else:
+        if len(offsets) == 1:
+            offset = offsets.pop()
+            if isinstance(offset, int) and offset >= 0:
+                table = (offset, by_value)
+
+    _variant_tables[key] = (message_def, table)
+    return table
+
+
 def extract_ubx_messages(data: bytes) -> list[bytes]:
     """Extract individual UBX messages from a byte stream.
     
@@ -262,19 +389,26 @@ def extract_ubx_messages(data: bytes) -> list[bytes]:
     """
     messages = []
     i = 0
+    last_start = len(data) - 8  # Last position a minimal message could start
+    search = _SYNC_PATTERN.search
     
-    while i < len(data) - 7:
-        # Look for sync characters
-        if data[i] == SYNC_CHAR_1 and data[i + 1] == SYNC_CHAR_2:
-            # Extract length
-            if i + 6 <= len(data):
-                payload_len = struct.unpack_from("<H", data, i + 4)[0]
-                msg_len = 6 + payload_len + 2
-                
-                if i + msg_len <= len(data):
-                    messages.append(data[i:i + msg_len])
-                    i += msg_len
-                    continue
-        i += 1
+    while True:
+        # Scan for the next sync pair in C
+        match = search(data, i)
+        if match is None:
+            break
+        i = match.start()
+        if i > last_start:
+            break
+
+        payload_len = data[i + 4] | (data[i + 5] << 8)
+        msg_len = 6 + payload_len + 2
+
+        if i + msg_len <= len(data):
+            messages.append(data[i:i + msg_len])
+            i += msg_len
+        else:
+            # Truncated or false sync: resume the scan one byte on
+            i += 1
     
     return messages
@@ -0,0 +1,82 @@
+"""UBX data types shared by the generator and parser."""
+
+import struct
+from functools import lru_cache
+from typing import NamedTuple
+
+# Data type to struct format and size
+DATA_TYPE_MAP = {
+    "U1": ("B", 1),
+    "I1": ("b", 1),
+    "X1": ("B", 1),
+    "U2": ("H", 2),
+    "I2": ("h", 2),
+    "X2": ("H", 2),
+    "U4": ("I", 4),
+    "I4": ("i", 4),
+    "X4": ("I", 4),
+    "R4": ("f", 4),
+    "R8": ("d", 8),
+    "CH": ("c", 1),  # Character
+}
+
+
+class TypeSpec(NamedTuple):
+    """A schema data_type parsed into what the codec needs."""
+    kind: str  # "scalar", "array" (fixed count), "variable" (count from value) or "opaque"
+    base_type: str
+    count: int  # Element count of a fixed array (1 for scalars, 0 otherwise)
+    size: int  # Encoded size in bytes, 0 when not known statically
+
+
+# Nested structures that can't be sized or encoded field by field
+OPAQUE = TypeSpec("opaque", "U1", 0, 0)
+
+
+def parse_type(data_type) -> TypeSpec:
+    """Parse a data_type (string like "U1[6]" or array_of dict) into a TypeSpec."""
+    # Handle data_type being a dict with array_of
+    if isinstance(data_type, dict):
+        if "array_of" in data_type:
+            base_type = data_type["array_of"]
+            # Nested structures can't be sized or encoded
+            if isinstance(base_type, dict):
+                return OPAQUE
+            count = data_type.get("count", 1)
+            # Variable count (string like 'N' or count_field) - sized by the value
+            if not isinstance(count, int):
+                return TypeSpec("variable", base_type, 0, 0)
+            return _array_spec(base_type, count)
+        # Handle other dict formats (num_elements_field, elements, etc.)
+        if "elements" in data_type or "num_elements_field" in data_type:
+            return OPAQUE
+        data_type = data_type.get("type", "U1")
+    if not isinstance(data_type, str):
+        data_type = "U1"  # Fallback
+    return _parse_type_string(data_type)
+
+
+@lru_cache(maxsize=512)
+def _parse_type_string(data_type: str) -> TypeSpec:
+    # Handle array types like "U1[6]" or "CH[30]" or "U1[]" (variable length)
+    if "[" in data_type:
+        base_type = data_type.split("[")[0]
+        count_str = data_type.split("[")[1].rstrip("]")
+        try:
+            count = int(count_str)
+        except ValueError:
+            # Empty count like "U1[]" or symbolic like "U1[N]"
+            return TypeSpec("variable", base_type, 0, 0)
+        return _array_spec(base_type, count)
+
+    return TypeSpec("scalar", data_type, 1, DATA_TYPE_MAP.get(data_type, ("B", 1))[1])
+
+
+def _array_spec(base_type: str, count: int) -> TypeSpec:
+    return TypeSpec("array", base_type, count, DATA_TYPE_MAP.get(base_type, ("B", 1))[1] * count)
+
+
+@lru_cache(maxsize=256)
+def array_struct(base_type: str, count: int) -> struct.Struct:
+    """Little-endian Struct for count elements of base_type at once."""
+    return struct.Struct(f"<{count}{DATA_TYPE_MAP.get(base_type, ('B', 1))[0]}")
@@ -16,18 +16,26 @@ def all_messages():
     return get_all_messages()
 
 
+@pytest.fixture(scope="session")
+def messages_by_name(all_messages):
+    """Index message definitions by name."""
+    return {msg.get("name"): msg for msg in all_messages}
+
+
+@pytest.fixture(scope="session")
+def field_names_by_msg(all_messages):
+    """Frozenset of top-level payload field names per message name."""
+    return {
+        msg.get("name"): frozenset(f["name"] for f in msg.get("payload", {}).get("fields", []))
+        for msg in all_messages
+    }
+
+
 @pytest.fixture(scope="session")
 def fixed_length_messages(all_messages):
     """Get only fixed-length messages."""
-    fixed = []
-    for msg in all_messages:
-        payload = msg.get("payload", {})
-        length = payload.get("length", {})
-        if isinstance(length, dict) and "fixed" in length:
-            fixed.append(msg)
-        elif isinstance(length, int):
-            fixed.append(msg)
-    return fixed
+    from lib.schema_loader import is_fixed_length
+    return [msg for msg in all_messages if is_fixed_length(msg)]
 
 
 @pytest.fixture(scope="session")
@@ -3,6 +3,7 @@
 import pytest
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -16,6 +17,9 @@ VALID_DATA_TYPES = {
     "X1", "X2", "X4", "X8",  # Bitfields
 }
 
+# Base types allowed in data_type, including CH for arrays like CH[n]
+ALLOWED_BASE_TYPES = VALID_DATA_TYPES | {"CH"}
+
 # Type capacity limits for enumeration types
 ENUM_TYPE_MAX = {
     "E1": 255,
@@ -24,9 +28,19 @@ ENUM_TYPE_MAX = {
     "E8": 18446744073709551615,
 }
 
+# ID and naming formats, compiled once for the module
+KEY_ID_PATTERN = re.compile(r"^0x[0-9a-fA-F]{8}$")
+ITEM_ID_PATTERN = re.compile(r"^0x[0-9a-fA-F]{4}$")
+GROUP_ID_PATTERN = re.compile(r"^0x[0-9a-fA-F]{2}$")
+KEY_NAME_PATTERN = re.compile(r"^CFG-[A-Z0-9]+-[A-Z0-9_]+$")
+# Valid manual IDs: "F9-HPG-1.51", "M10-SPG-5.30", "F9H", "F9-HPG-L1L5-1.40", "20-HPG-2.00"
+# Allow multiple dash-separated segments ending with version number
+SOURCE_PATTERN = re.compile(r"^[A-Z0-9]+(-[A-Z0-9.]+)+$|^[A-Z0-9]+$")
+
 
+@lru_cache(maxsize=1)
 def load_config_keys():
-    """Load config keys from JSON file."""
+    """Load config keys from JSON file (parsed once per session; don't mutate)."""
     keys_path = Path(__file__).parent.parent.parent / "data" / "config_keys" / "unified_config_keys.json"
     with open(keys_path) as f:
         return json.load(f)
@@ -44,9 +58,64 @@ def get_all_groups():
     return data.get("groups", {})
 
 
+@lru_cache(maxsize=1)
 def get_keys_with_inline_enum():
-    """Get config keys that have inline enumerations."""
-    return [k for k in get_all_keys() if "inline_enum" in k]
+    """Get config keys that have inline enumerations (filtered once per session)."""
+    return tuple(k for k in get_all_keys() if "inline_enum" in k)
+
+
+@lru_cache(maxsize=1)
+def get_inline_enum_items():
+    """Get (key_name, data_type, ((value_name, value_def), ...)) per inline enum."""
+    items = []
+    for key in get_keys_with_inline_enum():
+        values = key["inline_enum"].get("values", {})
+        items.append((
+            key.get("name"),
+            key.get("data_type", ""),
+            tuple(values.items()) if isinstance(values, dict) else (),
+        ))
+    return tuple(items)
+
+
+@lru_cache(maxsize=1)
+def get_key_validation_report():
+    """Run the per-key format checks in a single pass over all keys.
+
+    Returns a dict of failure lists, one per check; each test asserts on
+    its own list.
+    """
+    groups = get_all_groups()
+    report = {
+        "invalid_key_ids": [],
+        "invalid_item_ids": [],
+        "invalid_data_types": [],
+        "missing_groups": [],
+        "non_matching_names": [],
+    }
+    for key in get_all_keys():
+        name = key.get("name")
+
+        key_id = key.get("key_id", "")
+        if not KEY_ID_PATTERN.match(key_id):
+            report["invalid_key_ids"].append((name, key_id))
+
+        item_id = key.get("item_id")
+        if item_id and not ITEM_ID_PATTERN.match(item_id):
+            report["invalid_item_ids"].append((name, item_id))
+
+        data_type = key.get("data_type", "")
+        # Handle array types like CH[n]
+        if data_type.partition("[")[0] not in ALLOWED_BASE_TYPES:
+            report["invalid_data_types"].append((name, data_type))
+
+        group = key.get("group")
+        if group and group not in groups:
+            report["missing_groups"].append((name, group))
+
+        if not KEY_NAME_PATTERN.match(key.get("name", "")):
+            report["non_matching_names"].append(key.get("name", ""))
+    return report
 
 
 class TestConfigKeySchema:
@@ -74,14 +143,7 @@ class TestConfigKeySchema:
 
     def test_key_ids_valid_hex(self):
         """All key_id values should be valid hex format."""
-        keys = get_all_keys()
-        hex_pattern = re.compile(r"^0x[0-9a-fA-F]{8}$")
-
-        invalid = []
-        for key in keys:
-            key_id = key.get("key_id", "")
-            if not hex_pattern.match(key_id):
-                invalid.append((key.get("name"), key_id))
+        invalid = get_key_validation_report()["invalid_key_ids"]
 
         if invalid:
             msg = "Config keys with invalid key_id format:\n"
@@ -93,14 +155,7 @@ class TestConfigKeySchema:
 
     def test_item_ids_valid_hex(self):
         """All item_id values should be valid hex format."""
-        keys = get_all_keys()
-        hex_pattern = re.compile(r"^0x[0-9a-fA-F]{4}$")
-
-        invalid = []
-        for key in keys:
-            item_id = key.get("item_id")
-            if item_id and not hex_pattern.match(item_id):
-                invalid.append((key.get("name"), item_id))
+        invalid = get_key_validation_report()["invalid_item_ids"]
 
         if invalid:
             msg = "Config keys with invalid item_id format:\n"
@@ -112,15 +167,7 @@ class TestConfigKeySchema:
 
     def test_data_types_valid(self):
         """All data types should be valid UBX config types."""
-        keys = get_all_keys()
-
-        invalid = []
-        for key in keys:
-            data_type = key.get("data_type", "")
-            # Handle array types like CH[n]
-            base_type = data_type.split("[")[0] if "[" in data_type else data_type
-            if base_type not in VALID_DATA_TYPES and base_type != "CH":
-                invalid.append((key.get("name"), data_type))
+        invalid = get_key_validation_report()["invalid_data_types"]
 
         if invalid:
             msg = "Config keys with invalid data types:\n"
@@ -132,14 +179,7 @@ class TestConfigKeySchema:
 
     def test_groups_exist(self):
         """All referenced groups should exist in groups section."""
-        keys = get_all_keys()
-        groups = get_all_groups()
-
-        missing = []
-        for key in keys:
-            group = key.get("group")
-            if group and group not in groups:
-                missing.append((key.get("name"), group))
+        missing = get_key_validation_report()["missing_groups"]
 
         if missing:
             msg = "Config keys referencing non-existent groups:\n"
@@ -164,12 +204,11 @@ class TestConfigKeyGroups:
     def test_group_ids_valid_hex(self):
         """All group_id values should be valid hex format."""
         groups = get_all_groups()
-        hex_pattern = re.compile(r"^0x[0-9a-fA-F]{2}$")
 
         invalid = []
         for group_key, group in groups.items():
             gid = group.get("group_id", "")
-            if not hex_pattern.match(gid):
+            if not GROUP_ID_PATTERN.match(gid):
                 invalid.append((group_key, gid))
 
         if invalid:
@@ -224,28 +263,21 @@ class TestConfigKeyEnumerations:
 
     def test_inline_enum_values_have_required_fields(self):
         """Each enum value should have value field."""
-        keys_with_enum = get_keys_with_inline_enum()
-
-        for key in keys_with_enum:
-            enum = key.get("inline_enum", {})
-            for val_name, val_def in enum.get("values", {}).items():
+        for key_name, _, values in get_inline_enum_items():
+            for val_name, val_def in values:
                 assert "value" in val_def, (
-                    f"Config key '{key.get('name')}' enum value '{val_name}' missing 'value'"
+                    f"Config key '{key_name}' enum value '{val_name}' missing 'value'"
                 )
 
     def test_inline_enum_values_fit_type(self):
         """Enum values should fit within the E-type capacity."""
-        keys_with_enum = get_keys_with_inline_enum()
-
-        for key in keys_with_enum:
-            data_type = key.get("data_type", "")
+        for key_name, data_type, values in get_inline_enum_items():
             if data_type not in ENUM_TYPE_MAX:
                 continue
 
             max_val = ENUM_TYPE_MAX[data_type]
-            enum = key.get("inline_enum", {})
 
-            for val_name, val_def in enum.get("values", {}).items():
+            for val_name, val_def in values:
                 v = val_def.get("value", 0)
                 # Handle hex string values
                 if isinstance(v, str):
@@ -254,22 +286,19 @@ class TestConfigKeyEnumerations:
                     except ValueError:
                         continue  # Skip non-numeric values
                 assert 0 <= v <= max_val, (
-                    f"Config key '{key.get('name')}' enum value '{val_name}' ({v}) "
+                    f"Config key '{key_name}' enum value '{val_name}' ({v}) "
                     f"exceeds {data_type} max ({max_val})"
                 )
 
     def test_inline_enum_no_duplicate_values(self):
         """Enum values should not have duplicates within a key."""
-        keys_with_enum = get_keys_with_inline_enum()
-
-        for key in keys_with_enum:
-            enum = key.get("inline_enum", {})
-            values = [v["value"] for v in enum.get("values", {}).values()]
+        for key_name, _, items in get_inline_enum_items():
+            values = [val_def["value"] for _, val_def in items]
             unique_values = set(values)
 
             if len(values) != len(unique_values):
                 pytest.fail(
-                    f"Config key '{key.get('name')}' has duplicate enum values"
+                    f"Config key '{key_name}' has duplicate enum values"
                 )
 
 
@@ -303,13 +332,7 @@ class TestConfigKeyContent:
     def test_key_names_follow_convention(self):
         """Key names should follow CFG-GROUP-NAME convention."""
         keys = get_all_keys()
-        pattern = re.compile(r"^CFG-[A-Z0-9]+-[A-Z0-9_]+$")
-
-        non_matching = []
-        for key in keys:
-            name = key.get("name", "")
-            if not pattern.match(name):
-                non_matching.append(name)
+        non_matching = get_key_validation_report()["non_matching_names"]
 
         # Allow some exceptions but most should follow convention
         if len(non_matching) > len(keys) * 0.05:  # More than 5% don't match
@@ -345,16 +368,13 @@ class TestConfigKeyProvenance:
 
     def test_enum_values_have_sources(self):
         """Enum values should have sources list."""
-        keys_with_enum = get_keys_with_inline_enum()
-
         missing = []
-        for key in keys_with_enum:
-            enum = key.get("inline_enum", {})
-            for val_name, val_def in enum.get("values", {}).items():
+        for key_name, _, values in get_inline_enum_items():
+            for val_name, val_def in values:
                 if "sources" not in val_def:
-                    missing.append(f"{key.get('name')}.{val_name}")
+                    missing.append(f"{key_name}.{val_name}")
                 elif not val_def["sources"]:
-                    missing.append(f"{key.get('name')}.{val_name} (empty)")
+                    missing.append(f"{key_name}.{val_name} (empty)")
 
         if missing:
             msg = "Enum values missing sources:\n"
@@ -368,14 +388,10 @@ class TestConfigKeyProvenance:
         """Sources should be valid manual ID format."""
         keys = get_all_keys()
 
-        # Valid patterns: "F9-HPG-1.51", "M10-SPG-5.30", "F9H", "F9-HPG-L1L5-1.40", "20-HPG-2.00"
-        # Allow multiple dash-separated segments ending with version number
-        valid_pattern = re.compile(r"^[A-Z0-9]+(-[A-Z0-9.]+)+$|^[A-Z0-9]+$")
-
         invalid = []
         for key in keys:
             for source in key.get("sources", []):
-                if not valid_pattern.match(source):
+                if not SOURCE_PATTERN.match(source):
                     invalid.append((key.get("name"), source))
 
         if invalid:
@@ -3,175 +3,235 @@
 import pytest
 import json
 import sys
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from jsonschema import Draft202012Validator
+
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.schema_loader import get_all_messages
 
+# Type capacity limits as (min, max)
+TYPE_RANGES = {
+    "U1": (0, 255),
+    "U2": (0, 65535),
+    "U4": (0, 4294967295),
+    "U8": (0, 18446744073709551615),
+    "I1": (-128, 127),
+    "I2": (-32768, 32767),
+    "I4": (-2147483648, 2147483647),
+    "I8": (-9223372036854775808, 9223372036854775807),
+}
 
-# Type capacity limits
-TYPE_MAX_VALUES = {
-    "U1": 255,
-    "U2": 65535,
-    "U4": 4294967295,
-    "U8": 18446744073709551615,
-    "I1": 127,
-    "I2": 32767,
-    "I4": 2147483647,
-    "I8": 9223372036854775807,
+# Value entries need an integer value and a string name
+_ENUM_VALUE_SCHEMA = {
+    "type": "object",
+    "required": ["value", "name"],
+    "properties": {"value": {"type": "integer"}, "name": {"type": "string"}},
 }
 
-TYPE_MIN_VALUES = {
-    "U1": 0,
-    "U2": 0,
-    "U4": 0,
-    "U8": 0,
-    "I1": -128,
-    "I2": -32768,
-    "I4": -2147483648,
-    "I8": -9223372036854775808,
+# Shape of one enumeration: per_gnss signal tables, or a typed list of values
+# whose range follows the type
+ENUM_SCHEMA = {
+    "type": "object",
+    "if": {"required": ["per_gnss"]},
+    "then": {
+        "properties": {
+            "per_gnss": {
+                "type": "object",
+                "additionalProperties": {
+                    "type": "object",
+                    "properties": {"signals": {"type": "array", "items": _ENUM_VALUE_SCHEMA}},
+                },
+            },
+        },
+    },
+    "else": {
+        "required": ["type", "values"],
+        "properties": {
+            "type": {"enum": sorted(TYPE_RANGES)},
+            "values": {"type": "array", "items": _ENUM_VALUE_SCHEMA},
+        },
+        "allOf": [
+            {
+                "if": {"properties": {"type": {"const": enum_type}}},
+                "then": {"properties": {"values": {"items": {"properties": {"value": {
+                    "minimum": min_val,
+                    "maximum": max_val,
+                }}}}}},
+            }
+            for enum_type, (min_val, max_val) in TYPE_RANGES.items()
+        ],
+    },
 }
 
+# Compiled once for all enumerations
+Draft202012Validator.check_schema(ENUM_SCHEMA)
+ENUM_VALIDATOR = Draft202012Validator(ENUM_SCHEMA)
+
+
+ENUMS_PATH = Path(__file__).parent.parent.parent / "data" / "messages" / "enumerations.json"
+
 
 def load_enumerations():
-    """Load enumerations from JSON file."""
-    enums_path = Path(__file__).parent.parent.parent / "data" / "messages" / "enumerations.json"
-    with open(enums_path) as f:
-        return json.load(f)
+    """Load enumerations from JSON file (re-parsed only when it changes; don't mutate)."""
+    return _parse_enumerations(ENUMS_PATH.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _parse_enumerations(mtime_ns: int):
+    # Keyed on the file's mtime so an edited file is picked up on rerun
+    data = ENUMS_PATH.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
+# Returned by first_duplicate when every item is unique
+NO_DUPLICATE = object()
+
+
+def first_duplicate(items):
+    """Return the first item seen twice, stopping there, or NO_DUPLICATE."""
+    seen = set()
+    add = seen.add
+    return next((x for x in items if x in seen or add(x)), NO_DUPLICATE)
+
+
+@lru_cache(maxsize=1)
 def get_enum_names():
-    """Get list of enumeration names for parametrization."""
-    return list(load_enumerations().keys())
+    """Get enumeration names for parametrization."""
+    return tuple(load_enumerations().keys())
 
 
-class TestEnumerationSchema:
-    """Test enumeration schema integrity."""
+# Enumeration names to parametrize over, read once at collection
+ENUM_NAMES = get_enum_names()
 
-    def test_all_enums_have_required_fields(self):
-        """Every enumeration should have type and values fields (or per_gnss for special enums)."""
-        enums = load_enumerations()
-
-        for name, enum_def in enums.items():
-            # per_gnss enums (like sigId) have different structure
-            if "per_gnss" in enum_def:
-                continue
-            assert "type" in enum_def, f"Enumeration '{name}' missing 'type' field"
-            assert "values" in enum_def, f"Enumeration '{name}' missing 'values' field"
-            assert isinstance(enum_def["values"], list), f"Enumeration '{name}' values should be a list"
-
-    def test_enum_types_are_valid(self):
-        """Enumeration types should be valid UBX types."""
-        enums = load_enumerations()
-        valid_types = {"U1", "U2", "U4", "U8", "I1", "I2", "I4", "I8"}
-
-        for name, enum_def in enums.items():
-            enum_type = enum_def.get("type")
-            # Handle per_gnss special case (sigId enum)
-            if "per_gnss" in enum_def:
-                continue
-            assert enum_type in valid_types, f"Enumeration '{name}' has invalid type '{enum_type}'"
-
-    @pytest.mark.parametrize("enum_name", get_enum_names())
-    def test_enum_values_have_required_fields(self, enum_name):
-        """Each enum value should have value and name fields."""
-        enums = load_enumerations()
-        enum_def = enums[enum_name]
 
-        # Handle per_gnss special case
-        if "per_gnss" in enum_def:
-            for gnss_name, gnss_def in enum_def["per_gnss"].items():
-                for signal in gnss_def.get("signals", []):
-                    assert "value" in signal, f"Signal in '{enum_name}.{gnss_name}' missing 'value'"
-                    assert "name" in signal, f"Signal in '{enum_name}.{gnss_name}' missing 'name'"
-            return
+@pytest.fixture(scope="session")
+def enums():
+    """Parsed enumerations, shared by every test in the session."""
+    return load_enumerations()
 
-        for val in enum_def.get("values", []):
-            assert "value" in val, f"Value in '{enum_name}' missing 'value' field"
-            assert "name" in val, f"Value in '{enum_name}' missing 'name' field"
 
-    @pytest.mark.parametrize("enum_name", get_enum_names())
-    def test_enum_values_fit_type(self, enum_name):
-        """Enum values should fit within the type's capacity."""
-        enums = load_enumerations()
-        enum_def = enums[enum_name]
+@pytest.fixture(scope="session")
+def regular_enums(enums):
+    """Enumerations with a plain type and values list (no per_gnss tables)."""
+    return {name: enum_def for name, enum_def in enums.items() if "per_gnss" not in enum_def}
 
-        # Handle per_gnss special case
+
+@pytest.fixture(scope="session")
+def enum_projections(enums):
+    """Per-enum value and name tuples, extracted once for all tests.
+
+    per_gnss enums map to {"per_gnss": {gnss_name: signal value tuple}};
+    the rest to {"values": (...), "names": (...)}.
+    """
+    projections = {}
+    for name, enum_def in enums.items():
         if "per_gnss" in enum_def:
-            return  # Per-GNSS enums use U1 implicitly
+            projections[name] = {"per_gnss": {
+                gnss_name: tuple(s["value"] for s in gnss_def.get("signals", []))
+                for gnss_name, gnss_def in enum_def["per_gnss"].items()
+            }}
+            continue
+        values = enum_def.get("values", [])
+        projections[name] = {
+            "values": tuple(v["value"] for v in values),
+            "names": tuple(v["name"] for v in values),
+        }
+    return projections
 
-        enum_type = enum_def.get("type")
-        if enum_type not in TYPE_MAX_VALUES:
-            pytest.skip(f"Unknown type '{enum_type}'")
 
-        max_val = TYPE_MAX_VALUES[enum_type]
-        min_val = TYPE_MIN_VALUES[enum_type]
+class TestEnumerationSchema:
+    """Test enumeration schema integrity."""
 
-        for val in enum_def.get("values", []):
-            v = val["value"]
-            assert min_val <= v <= max_val, (
-                f"Value {v} in '{enum_name}' exceeds {enum_type} range [{min_val}, {max_val}]"
-            )
+    @pytest.mark.parametrize("bad_enum", [
+        {"type": "U1", "values": [{"value": "0x1FF", "name": "A"}]},
+        {"type": "U1", "values": [{"value": True, "name": "A"}]},
+        {"type": "U1", "values": [{"value": None, "name": "A"}]},
+        {"type": "U1", "values": [{"value": 256, "name": "A"}]},
+        {"type": "I1", "values": [{"value": -129, "name": "A"}]},
+        {"type": "U1", "values": [{"value": 1, "name": 1}]},
+        {"type": "U1", "values": [{"value": 1}]},
+        {"type": "X1", "values": []},
+        {"type": "U1"},
+        {"per_gnss": {"gps": 5}},
+        {"per_gnss": {"gps": {"signals": [{"value": "1", "name": "L1"}]}}},
+    ])
+    def test_schema_rejects_bad_enum(self, bad_enum):
+        """ENUM_SCHEMA reports errors for malformed enumerations."""
+        assert list(ENUM_VALIDATOR.iter_errors(bad_enum)), f"Schema accepted {bad_enum!r}"
+
+    def test_enums_match_schema(self, enums):
+        """Every enumeration validates against ENUM_SCHEMA in one pass.
+
+        Covers the type and values fields, valid UBX types, value and name on
+        every value (and per_gnss signal), and values fitting their type.
+        """
+        errors = [
+            (name, error)
+            for name, enum_def in enums.items()
+            for error in ENUM_VALIDATOR.iter_errors(enum_def)
+        ]
+
+        if errors:
+            msg = "Enumerations not matching the enumeration schema:\n"
+            for name, error in errors[:10]:
+                path = "/".join(str(p) for p in error.absolute_path)
+                msg += f"  {name}/{path}: {error.message}\n"
+            if len(errors) > 10:
+                msg += f"  ... and {len(errors) - 10} more"
+            pytest.fail(msg)
 
-    @pytest.mark.parametrize("enum_name", get_enum_names())
-    def test_no_duplicate_values(self, enum_name):
+    @pytest.mark.parametrize("enum_name", ENUM_NAMES)
+    def test_no_duplicate_values(self, enum_projections, enum_name):
         """Enum values should not have duplicates."""
-        enums = load_enumerations()
-        enum_def = enums[enum_name]
+        projection = enum_projections[enum_name]
 
         # Handle per_gnss special case
-        if "per_gnss" in enum_def:
-            for gnss_name, gnss_def in enum_def["per_gnss"].items():
-                values = [s["value"] for s in gnss_def.get("signals", [])]
-                unique_values = set(values)
-                assert len(values) == len(unique_values), (
-                    f"Duplicate values in '{enum_name}.{gnss_name}'"
+        if "per_gnss" in projection:
+            for gnss_name, values in projection["per_gnss"].items():
+                dup = first_duplicate(values)
+                assert dup is NO_DUPLICATE, (
+                    f"Duplicate values in '{enum_name}.{gnss_name}': {dup!r}"
                 )
             return
 
-        values = [v["value"] for v in enum_def.get("values", [])]
-        unique_values = set(values)
-        assert len(values) == len(unique_values), f"Duplicate values in '{enum_name}'"
+        dup = first_duplicate(projection["values"])
+        assert dup is NO_DUPLICATE, f"Duplicate values in '{enum_name}': {dup!r}"
 
-    @pytest.mark.parametrize("enum_name", get_enum_names())
-    def test_no_duplicate_names(self, enum_name):
+    @pytest.mark.parametrize("enum_name", ENUM_NAMES)
+    def test_no_duplicate_names(self, enum_projections, enum_name):
         """Enum value names should be unique within an enum."""
-        enums = load_enumerations()
-        enum_def = enums[enum_name]
+        projection = enum_projections[enum_name]
 
         # Handle per_gnss special case
-        if "per_gnss" in enum_def:
+        if "per_gnss" in projection:
             return  # Names can repeat across GNSS systems
 
-        names = [v["name"] for v in enum_def.get("values", [])]
-        unique_names = set(names)
-        assert len(names) == len(unique_names), f"Duplicate names in '{enum_name}'"
+        dup = first_duplicate(projection["names"])
+        assert dup is NO_DUPLICATE, f"Duplicate names in '{enum_name}': {dup!r}"
 
 
 class TestEnumerationCrossReference:
     """Test enumeration cross-references with messages."""
 
-    def test_occurrences_count_present(self):
+    def test_occurrences_count_present(self, regular_enums):
         """Enumerations should have occurrence tracking."""
-        enums = load_enumerations()
-
-        for name, enum_def in enums.items():
-            # Per-GNSS enums may not have occurrences
-            if "per_gnss" in enum_def:
-                continue
+        # Per-GNSS enums may not have occurrences
+        for name, enum_def in regular_enums.items():
             assert "occurrences" in enum_def or "messages" in enum_def, (
                 f"Enumeration '{name}' missing occurrence tracking"
             )
 
-    def test_messages_list_exists(self):
+    def test_messages_list_exists(self, regular_enums):
         """Enumerations with occurrences should list messages."""
-        enums = load_enumerations()
-
-        for name, enum_def in enums.items():
-            if "per_gnss" in enum_def:
-                continue
+        for name, enum_def in regular_enums.items():
             if enum_def.get("occurrences", 0) > 0:
                 assert "messages" in enum_def, (
                     f"Enumeration '{name}' has occurrences but no messages list"
@@ -180,15 +240,12 @@ class TestEnumerationCrossReference:
                     f"Enumeration '{name}' has empty messages list"
                 )
 
-    def test_referenced_messages_exist(self):
+    def test_referenced_messages_exist(self, regular_enums, messages_by_name):
         """Messages referenced by enumerations should exist in schema."""
-        enums = load_enumerations()
-        message_names = {msg.get("name") for msg in get_all_messages()}
+        message_names = messages_by_name.keys()
 
         missing = []
-        for name, enum_def in enums.items():
-            if "per_gnss" in enum_def:
-                continue
+        for name, enum_def in regular_enums.items():
             for msg_name in enum_def.get("messages", []):
                 if msg_name not in message_names:
                     missing.append((name, msg_name))
@@ -206,22 +263,17 @@ class TestEnumerationCrossReference:
 class TestEnumerationContent:
     """Test enumeration content quality."""
 
-    def test_total_enumeration_count(self):
+    def test_total_enumeration_count(self, enums):
         """Verify we have the expected number of enumerations."""
-        enums = load_enumerations()
         # Currently have 23 enumerations
         assert len(enums) >= 20, f"Expected at least 20 enumerations, got {len(enums)}"
 
-    def test_enum_values_have_descriptions(self):
+    def test_enum_values_have_descriptions(self, regular_enums):
         """Most enum values should have descriptions."""
-        enums = load_enumerations()
-
         total_values = 0
         with_description = 0
 
-        for name, enum_def in enums.items():
-            if "per_gnss" in enum_def:
-                continue
+        for name, enum_def in regular_enums.items():
             for val in enum_def.get("values", []):
                 total_values += 1
                 if val.get("description"):
@@ -234,10 +286,8 @@ class TestEnumerationContent:
                 f"Only {ratio:.1%} of enum values have descriptions (expected >= 80%)"
             )
 
-    def test_sigId_has_gnss_contexts(self):
+    def test_sigId_has_gnss_contexts(self, enums):
         """The sigId enumeration should have per-GNSS contexts."""
-        enums = load_enumerations()
-
         if "sigId" not in enums:
             pytest.skip("sigId enumeration not present")
 
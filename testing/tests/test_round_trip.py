@@ -1,77 +1,198 @@
 """Round-trip tests: Generate UBX from our schema, parse it back, compare."""
 
+import copy
 import pytest
 import sys
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.schema_loader import get_all_messages, parse_hex_id
-from lib.ubx_generator import generate_ubx_message, generate_test_values
-from lib.ubx_parser import parse_ubx_message, UBXParseError
+from lib.schema_loader import get_all_messages, get_message_by_name, is_fixed_length, parse_hex_id
+from lib.ubx_generator import (
+    clear_caches,
+    compile_encoder,
+    generate_ubx_batch,
+    generate_ubx_message,
+    generate_test_values,
+)
+from lib.ubx_parser import extract_ubx_messages, parse_ubx_message, UBXParseError
 
+# Simplified field sizes for the offset overlap check; other types count as 1 byte
+FIELD_SIZES = {"U1": 1, "I1": 1, "U2": 2, "I2": 2, "U4": 4, "I4": 4, "R4": 4, "R8": 8, "CH": 1}
 
+
+@lru_cache(maxsize=1)
 def get_fixed_length_messages():
-    """Get messages with fixed payload length (easier to test)."""
-    messages = []
-    for msg in get_all_messages():
-        payload = msg.get("payload", {})
-        length = payload.get("length", {})
-        
-        # Check if fixed length
-        if isinstance(length, dict) and "fixed" in length:
-            messages.append(msg)
-        elif isinstance(length, int):
-            messages.append(msg)
-    
-    return messages
+    """Get messages with fixed payload length (easier to test), filtered once."""
+    return tuple(msg for msg in get_all_messages() if is_fixed_length(msg))
+
+
+@pytest.fixture(scope="session")
+def generated_messages():
+    """The first 20 schema messages with their default encodings, generated once."""
+    return [(msg, generate_ubx_message(msg)) for msg in get_all_messages()[:20]]
 
 
 class TestRoundTrip:
     """Test that our generator and parser are internally consistent."""
     
-    def test_basic_message_generation(self):
+    def test_basic_message_generation(self, generated_messages):
         """Test that we can generate a basic message."""
-        messages = get_all_messages()
-        assert len(messages) > 0, "No messages in schema"
+        assert len(generated_messages) > 0, "No messages in schema"
         
         # Try first message
-        msg = messages[0]
-        data = generate_ubx_message(msg)
+        msg, data = generated_messages[0]
         
         assert data is not None
         assert len(data) >= 8  # Minimum UBX message size
         assert data[0] == 0xB5  # Sync char 1
         assert data[1] == 0x62  # Sync char 2
     
-    def test_message_has_correct_class_id(self):
+    def test_message_has_correct_class_id(self, generated_messages):
         """Test that generated message has correct class/message IDs."""
-        messages = get_all_messages()
-        
-        for msg in messages[:10]:  # Test first 10
-            data = generate_ubx_message(msg)
-            
+        for msg, data in generated_messages[:10]:  # Test first 10
             expected_class = parse_hex_id(msg.get("class_id", 0))
             expected_msg_id = parse_hex_id(msg.get("message_id", 0))
             
             assert data[2] == expected_class, f"Class ID mismatch for {msg.get('name')}"
             assert data[3] == expected_msg_id, f"Message ID mismatch for {msg.get('name')}"
     
-    def test_checksum_valid(self):
+    def test_checksum_valid(self, generated_messages):
         """Test that generated messages have valid checksums."""
-        messages = get_all_messages()
-        
-        for msg in messages[:20]:  # Test first 20
-            data = generate_ubx_message(msg)
-            
+        for msg, data in generated_messages:  # Test first 20
             # Parser will fail if checksum is invalid
             try:
                 parsed = parse_ubx_message(data, msg)
                 assert parsed["parsed"], f"Failed to parse {msg.get('name')}"
             except UBXParseError as e:
                 pytest.fail(f"Checksum error for {msg.get('name')}: {e}")
-    
+
+    def test_parse_releases_bytearray(self):
+        """A bytearray can be resized after parsing, or after a parse error."""
+        frame = bytearray(generate_ubx_message(get_message_by_name("UBX-NAV-PVT")))
+        assert parse_ubx_message(frame)["parsed"]
+        frame.append(0)
+
+        frame[-2] ^= 0xFF  # Corrupt ck_b
+        with pytest.raises(UBXParseError) as excinfo:
+            parse_ubx_message(frame)
+        # The kept traceback must not pin the buffer
+        assert excinfo.value is not None
+        frame.clear()
+
+    def test_test_values_are_reproducible(self):
+        """Test values are seeded per message, so regenerating them agrees."""
+        msg = get_message_by_name("UBX-NAV-SAT")  # Has a repeated group
+        values = generate_test_values(msg, num_repeated=2)
+        # Drop the memoized values so the second call draws them again
+        clear_caches()
+        regenerated = generate_test_values(msg, num_repeated=2)
+        assert regenerated == values
+        assert generate_ubx_message(msg, regenerated) == generate_ubx_message(msg, values)
+
+    def test_test_values_are_not_shared(self):
+        """Mutating returned test values doesn't change later calls."""
+        msg = get_message_by_name("UBX-MGA-GPS")
+        values = generate_test_values(msg, variant_name="ALM")
+        values.clear()
+        generate_ubx_message(msg, variant_name="EPH")  # Inserts its discriminator
+        assert generate_test_values(msg, variant_name="ALM").get("type") == 2
+
+    def test_ad_hoc_message_ids_are_not_cached(self):
+        """Ids of a caller's own message dict are read afresh and not stored in it."""
+        msg = {
+            "name": "UBX-TEST-IDS",
+            "class_id": "0x05",
+            "message_id": "0x01",
+            "payload": {"length": {"fixed": 0}, "fields": []},
+        }
+        assert generate_ubx_message(msg, {})[2:4] == b"\x05\x01"
+        msg["message_id"] = "0x00"
+        assert generate_ubx_message(msg, {})[2:4] == b"\x05\x00"
+        assert not any(key.startswith("_") for key in msg)
+
+    def test_schema_messages_have_no_private_keys(self):
+        """Loading the schema doesn't add keys to its message dicts."""
+        for msg in get_all_messages():
+            assert not any(key.startswith("_") for key in msg), msg.get("name")
+
+    def test_copied_schema_message_uses_its_own_ids(self):
+        """A copy of a schema message with a changed id encodes the new id."""
+        msg = copy.deepcopy(get_message_by_name("UBX-ACK-ACK"))
+        assert generate_ubx_message(msg)[2:4] == b"\x05\x01"
+        msg["message_id"] = "0x00"
+        assert generate_ubx_message(msg)[2:4] == b"\x05\x00"
+
+    @pytest.mark.parametrize("name", ["UBX-NAV-SVINFO", "UBX-CFG-DOSC"])
+    def test_repeated_group_tuple_instances(self, messages_by_name, name):
+        """Tuple instances in byte_offset order encode like dict instances."""
+        msg = messages_by_name[name]
+        values = generate_test_values(msg, num_repeated=3)
+
+        as_tuples = dict(values)
+        as_tuples["_repeated_groups"] = {}
+        for rg in msg["payload"]["repeated_groups"]:
+            fields = sorted(rg.get("fields", []), key=lambda f: f.get("byte_offset", 0))
+            as_tuples["_repeated_groups"][rg["name"]] = [
+                tuple(instance[f["name"]] for f in fields)
+                for instance in values["_repeated_groups"][rg["name"]]
+            ]
+
+        assert generate_ubx_message(msg, as_tuples) == generate_ubx_message(msg, values)
+
+    def test_compiled_encoder_matches_generator(self):
+        """compile_encoder gives the same bytes as generate_ubx_message."""
+        for msg in get_all_messages():
+            values = generate_test_values(msg)
+            encode = compile_encoder(msg)
+            assert encode(dict(values)) == generate_ubx_message(msg, dict(values)), msg.get("name")
+            assert encode({}) == generate_ubx_message(msg, {}), msg.get("name")
+
+    def test_batch_matches_serial_generation(self):
+        """generate_ubx_batch returns the same frames, in order, from worker processes."""
+        messages = get_all_messages()[:20]
+        values = [generate_test_values(msg, num_repeated=2) for msg in messages]
+        expected = [generate_ubx_message(msg, dict(v)) for msg, v in zip(messages, values)]
+        assert generate_ubx_batch(messages, [dict(v) for v in values], workers=2, chunksize=4) == expected
+        assert generate_ubx_batch(messages, values) == expected
+
+    def test_batch_rejects_mismatched_field_values(self):
+        """generate_ubx_batch raises instead of dropping unmatched messages."""
+        messages = get_all_messages()[:3]
+        with pytest.raises(ValueError):
+            generate_ubx_batch(messages, [None, None], workers=1)
+
+    def test_batch_leaves_field_values_unchanged(self):
+        """Discriminators are added to copies, not the caller's dicts."""
+        msg = get_message_by_name("UBX-MGA-GPS")
+        values = [{}]
+        generate_ubx_batch([msg], values, variant_name="EPH", workers=1)
+        assert values == [{}]
+
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+    def test_extract_messages_from_stream(self, wrap):
+        """Messages are split out of a stream with junk bytes and a truncated tail."""
+        frames = [generate_ubx_message(msg) for msg in get_all_messages()[:10]]
+        stream = b"\x00\xb5" + b"\xff".join(frames) + frames[0][:-1]
+        extracted = extract_ubx_messages(wrap(stream))
+        assert [bytes(m) for m in extracted] == frames
+
+    def test_array_values_match_lists(self, messages_by_name):
+        """array_values=True gives array.array fields equal to the default lists."""
+        msg = messages_by_name["UBX-RXM-QZSSL6"]
+        data = generate_ubx_message(msg, generate_test_values(msg))
+        as_lists = parse_ubx_message(data, msg)["fields"]
+        as_arrays = parse_ubx_message(data, msg, array_values=True)["fields"]
+        assert as_arrays.keys() == as_lists.keys()
+        for name, value in as_arrays.items():
+            if isinstance(as_lists[name], list):
+                assert value.tolist() == as_lists[name], name
+            else:
+                assert value == as_lists[name], name
+
     @pytest.mark.parametrize("msg", get_fixed_length_messages()[:50])
     def test_round_trip_fixed_length(self, msg):
         """Test round-trip for fixed-length messages."""
@@ -104,7 +225,10 @@ class TestRoundTrip:
                     assert abs(original - roundtrip) < 0.001, \
                         f"Field {name} mismatch: {original} != {roundtrip}"
                 elif isinstance(original, list):
-                    # Compare lists element by element
+                    # Exact matches (integer arrays) compare in one C-level step
+                    if original == roundtrip:
+                        continue
+                    # Otherwise compare element by element, floats with tolerance
                     for i, (o, r) in enumerate(zip(original, roundtrip)):
                         if isinstance(o, float):
                             assert abs(o - r) < 0.001, \
@@ -116,6 +240,44 @@ class TestRoundTrip:
                         f"Field {name} mismatch: {original} != {roundtrip}"
 
 
+def estimate_field_size(data_type) -> int:
+    """Simplified byte size of a data_type, for the offset overlap check."""
+    if isinstance(data_type, dict):
+        data_type = data_type.get("type", "U1")
+    if not isinstance(data_type, str):
+        data_type = "U1"
+    base, bracket, count_str = data_type.partition("[")
+    if bracket:
+        count_str = count_str.rstrip("]")
+        # Handle variable-length arrays like U1[] where count is empty
+        count = int(count_str) if count_str.isdigit() else 0
+        return FIELD_SIZES.get(base, 1) * count
+    return FIELD_SIZES.get(data_type, 1)
+
+
+@pytest.fixture(scope="session")
+def normalized_fields():
+    """Per message with fields: (name, ((byte_offset, field name, size), ...)).
+
+    Fields are sorted by offset and those without an integer offset dropped.
+    """
+    normalized = []
+    for msg in get_all_messages():
+        fields = msg.get("payload", {}).get("fields", [])
+        if not fields:
+            continue
+        sorted_fields = sorted(
+            (
+                (f["byte_offset"], f.get("name"), estimate_field_size(f.get("data_type", "U1")))
+                for f in fields
+                if isinstance(f.get("byte_offset"), int)
+            ),
+            key=itemgetter(0),
+        )
+        normalized.append((msg.get("name", "UNKNOWN"), tuple(sorted_fields)))
+    return normalized
+
+
 class TestSchemaIntegrity:
     """Test schema integrity and completeness."""
     
@@ -129,50 +291,16 @@ class TestSchemaIntegrity:
             assert msg.get("message_id") is not None, f"{name} missing message_id"
             assert msg.get("message_type") is not None, f"{name} missing message_type"
     
-    def test_field_offsets_are_sequential(self):
+    def test_field_offsets_are_sequential(self, normalized_fields):
         """Test that field offsets don't overlap or have unexpected gaps."""
-        messages = get_all_messages()
-        
-        for msg in messages:
-            name = msg.get("name", "UNKNOWN")
-            payload = msg.get("payload", {})
-            fields = payload.get("fields", [])
-            
-            if not fields:
-                continue
-            
-            # Sort by offset (handle None values by putting them at the end)
-            def get_offset_key(f):
-                offset = f.get("byte_offset")
-                return (0, offset) if isinstance(offset, int) else (1, 0)
-            sorted_fields = sorted(fields, key=get_offset_key)
-            
+        for name, fields in normalized_fields:
             # Check for overlaps (basic check)
             # Note: Some messages have variant fields at same offset, so we just warn
             prev_end = 0
             overlaps = []
-            for field in sorted_fields:
-                offset = field.get("byte_offset")
-                if not isinstance(offset, int):
-                    continue  # Skip fields without valid byte offsets
+            for offset, field_name, size in fields:
                 if offset < prev_end:
-                    overlaps.append(f"{name}: Field {field.get('name')} at offset {offset} overlaps with previous field ending at {prev_end}")
-                
-                # Estimate field size (simplified)
-                data_type = field.get("data_type", "U1")
-                if isinstance(data_type, dict):
-                    data_type = data_type.get("type", "U1")
-                if not isinstance(data_type, str):
-                    data_type = "U1"
-                if "[" in data_type:
-                    base = data_type.split("[")[0]
-                    count_str = data_type.split("[")[1].rstrip("]")
-                    # Handle variable-length arrays like U1[] where count is empty
-                    count = int(count_str) if count_str.isdigit() else 0
-                    size = {"U1": 1, "I1": 1, "U2": 2, "I2": 2, "U4": 4, "I4": 4, "R4": 4, "R8": 8, "CH": 1}.get(base, 1) * count
-                else:
-                    size = {"U1": 1, "I1": 1, "U2": 2, "I2": 2, "U4": 4, "I4": 4, "R4": 4, "R8": 8}.get(data_type, 1)
-                
+                    overlaps.append(f"{name}: Field {field_name} at offset {offset} overlaps with previous field ending at {prev_end}")
                 prev_end = offset + size
         
         # Report overlaps but don't fail (some are intentional variants)
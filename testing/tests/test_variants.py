@@ -15,6 +15,30 @@ from lib.schema_loader import (
 from lib.ubx_generator import generate_ubx_message, generate_test_values
 from lib.ubx_parser import parse_ubx_message
 
+# Variants of UBX-MGA-GPS, in schema order
+MGA_GPS_VARIANTS = ["EPH", "ALM", "HEALTH", "UTC", "IONO"]
+
+
+@pytest.fixture(scope="session")
+def mga_gps_msg():
+    """The consolidated UBX-MGA-GPS message definition."""
+    return get_message_by_name("UBX-MGA-GPS")
+
+
+@pytest.fixture(scope="session")
+def mga_gps_variants(mga_gps_msg):
+    """UBX-MGA-GPS variant definitions by name."""
+    return {v["name"]: v for v in mga_gps_msg["variants"]}
+
+
+@pytest.fixture(scope="session")
+def generated_mga_gps(mga_gps_msg):
+    """Each UBX-MGA-GPS variant encoded with its test values, by variant name."""
+    return {
+        name: generate_ubx_message(mga_gps_msg, variant_name=name)
+        for name in MGA_GPS_VARIANTS
+    }
+
 
 class TestVariantLookup:
     """Test variant lookup functions."""
@@ -51,33 +75,33 @@ class TestVariantLookup:
 class TestVariantSelection:
     """Test variant selection from payload."""
 
-    def test_select_variant_by_type_field(self):
+    def test_select_variant_by_type_field(self, mga_gps_msg):
         """Correct variant is selected based on type field value."""
-        msg = get_message_by_name("UBX-MGA-GPS")
+        msg = mga_gps_msg
 
         # EPH has type=1
-        payload_eph = bytes([1] + [0] * 67)
+        payload_eph = bytes((1,)) + bytes(67)
         variant = select_variant_by_payload(msg, payload_eph)
         assert variant is not None
         assert variant["name"] == "EPH"
 
         # ALM has type=2
-        payload_alm = bytes([2] + [0] * 35)
+        payload_alm = bytes((2,)) + bytes(35)
         variant = select_variant_by_payload(msg, payload_alm)
         assert variant is not None
         assert variant["name"] == "ALM"
 
         # HEALTH has type=4
-        payload_health = bytes([4] + [0] * 39)
+        payload_health = bytes((4,)) + bytes(39)
         variant = select_variant_by_payload(msg, payload_health)
         assert variant is not None
         assert variant["name"] == "HEALTH"
 
-    def test_select_variant_returns_none_for_unknown_type(self):
+    def test_select_variant_returns_none_for_unknown_type(self, mga_gps_msg):
         """Returns None when no variant matches."""
-        msg = get_message_by_name("UBX-MGA-GPS")
+        msg = mga_gps_msg
         # Type 99 doesn't exist
-        payload_unknown = bytes([99] + [0] * 35)
+        payload_unknown = bytes((99,)) + bytes(35)
         variant = select_variant_by_payload(msg, payload_unknown)
         assert variant is None
 
@@ -85,69 +109,61 @@ class TestVariantSelection:
 class TestVariantGeneration:
     """Test generating variant messages."""
 
-    def test_generate_test_values_includes_discriminator(self):
+    def test_generate_test_values_includes_discriminator(self, mga_gps_msg):
         """Generated values include the discriminator field."""
-        msg = get_message_by_name("UBX-MGA-GPS")
+        msg = mga_gps_msg
         values = generate_test_values(msg, variant_name="EPH")
         assert values.get("type") == 1
 
         values = generate_test_values(msg, variant_name="ALM")
         assert values.get("type") == 2
 
-    def test_generate_variant_message_has_correct_type(self):
+    def test_generate_variant_message_has_correct_type(self, generated_mga_gps):
         """Generated variant message has correct type field in payload."""
-        msg = get_message_by_name("UBX-MGA-GPS")
-
-        # Generate EPH variant
-        binary = generate_ubx_message(msg, variant_name="EPH")
+        # EPH variant
+        binary = generated_mga_gps["EPH"]
         # Type field is at payload offset 0, which is byte 6 in full message
         assert binary[6] == 1
 
-        # Generate ALM variant
-        binary = generate_ubx_message(msg, variant_name="ALM")
+        # ALM variant
+        binary = generated_mga_gps["ALM"]
         assert binary[6] == 2
 
 
 class TestVariantParsing:
     """Test parsing variant messages."""
 
-    def test_parse_identifies_correct_variant(self):
+    def test_parse_identifies_correct_variant(self, mga_gps_msg, generated_mga_gps):
         """Parser correctly identifies variant from payload."""
-        msg = get_message_by_name("UBX-MGA-GPS")
-
-        # Generate and parse EPH variant
-        binary = generate_ubx_message(msg, variant_name="EPH")
-        parsed = parse_ubx_message(binary, msg)
+        # Parse the generated EPH variant
+        parsed = parse_ubx_message(generated_mga_gps["EPH"], mga_gps_msg)
 
         assert parsed["parsed"] is True
         assert parsed["variant"] == "EPH"
         assert parsed["variant_alias"] == "UBX-MGA-GPS-EPH"
         assert parsed["fields"]["type"] == 1
 
-    def test_parse_variant_roundtrip(self):
+    @pytest.mark.parametrize("variant_name", MGA_GPS_VARIANTS)
+    def test_parse_variant_roundtrip(self, mga_gps_msg, mga_gps_variants, generated_mga_gps, variant_name):
         """Variant message round-trips correctly."""
-        msg = get_message_by_name("UBX-MGA-GPS")
+        # Encoded from generate_test_values(msg, variant_name=variant_name)
+        parsed = parse_ubx_message(generated_mga_gps[variant_name], mga_gps_msg)
 
-        for variant_name in ["EPH", "ALM", "HEALTH", "UTC", "IONO"]:
-            values = generate_test_values(msg, variant_name=variant_name)
-            binary = generate_ubx_message(msg, field_values=values, variant_name=variant_name)
-            parsed = parse_ubx_message(binary, msg)
+        assert parsed["parsed"] is True, f"Failed to parse {variant_name}"
+        assert parsed["variant"] == variant_name, f"Wrong variant for {variant_name}"
 
-            assert parsed["parsed"] is True, f"Failed to parse {variant_name}"
-            assert parsed["variant"] == variant_name, f"Wrong variant for {variant_name}"
-
-            # Check type field matches
-            variant_info = next(v for v in msg["variants"] if v["name"] == variant_name)
-            expected_type = variant_info["discriminator"]["value"]
-            assert parsed["fields"]["type"] == expected_type
+        # Check type field matches
+        variant_info = mga_gps_variants[variant_name]
+        expected_type = variant_info["discriminator"]["value"]
+        assert parsed["fields"]["type"] == expected_type
 
 
 class TestVariantAliasesProperty:
     """Test variant_aliases property in consolidated messages."""
 
-    def test_variant_aliases_contains_legacy_names(self):
+    def test_variant_aliases_contains_legacy_names(self, mga_gps_msg):
         """variant_aliases contains all legacy suffix names."""
-        msg = get_message_by_name("UBX-MGA-GPS")
+        msg = mga_gps_msg
         aliases = msg.get("variant_aliases", [])
 
         expected = [
@@ -2,56 +2,101 @@
 
 import pytest
 import sys
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.schema_loader import get_all_messages, get_message_by_name, parse_hex_id
+from lib.schema_loader import get_all_messages, get_message_by_name, is_fixed_length, parse_hex_id
 from lib.ubx_generator import generate_ubx_message, generate_test_values
 from lib.ubx_parser import parse_ubx_message
-from external.pyubx2_adapter import (
-    is_available as pyubx2_available,
-    parse_ubx_bytes,
-    generate_ubx_message as pyubx2_generate,
-    get_supported_messages,
-    get_message_definition,
-)
 
 
-# Skip all tests if pyubx2 not installed
+# Skip all tests if pyubx2 not installed (checked without importing it)
 pytestmark = pytest.mark.skipif(
-    not pyubx2_available(),
+    find_spec("pyubx2") is None,
     reason="pyubx2 not installed"
 )
 
+_adapter = None
+
+
+def _get_adapter():
+    """The pyubx2 adapter module, imported (along with pyubx2) on first use."""
+    global _adapter
+    if _adapter is None:
+        from external import pyubx2_adapter
+        _adapter = pyubx2_adapter
+    return _adapter
+
+
+@lru_cache(maxsize=1)
+def get_pyubx2_messages():
+    """Get the set of message names pyubx2 supports (built once per session)."""
+    return frozenset(_get_adapter().get_supported_messages())
+
+
+@lru_cache(maxsize=None)
+def pyubx2_generate_frame(msg_name, frozen_values):
+    """Frame pyubx2 generates for msg_name from sorted (field, value) items.
+
+    pyubx2's serialization is deterministic, so each frame is made once
+    per session and shared.
+    """
+    return _get_adapter().generate_ubx_message(msg_name, dict(frozen_values))
+
+
+@lru_cache(maxsize=1)
+def get_pyubx2_short_names():
+    """pyubx2 message names without the "UBX-" prefix (built once per session)."""
+    return frozenset(name.removeprefix("UBX-") for name in get_pyubx2_messages())
+
+
+@lru_cache(maxsize=None)
+def generate_test_frame(msg_name):
+    """Encode a schema message with its test values, once per message name."""
+    msg = get_message_by_name(msg_name)
+    return generate_ubx_message(msg, generate_test_values(msg))
+
+
+@lru_cache(maxsize=None)
+def get_pyubx2_field_names(msg_name):
+    """Frozenset of pyubx2's field names for a message, or None if unknown."""
+    pyubx2_def = _get_adapter().get_message_definition(msg_name)
+    if pyubx2_def is None:
+        return None
+    return frozenset(pyubx2_def.get("fields", {}))
+
+
+@pytest.fixture(scope="session")
+def pyubx2_messages():
+    """Message names pyubx2 supports."""
+    return get_pyubx2_messages()
 
+
+@lru_cache(maxsize=1)
 def get_common_messages():
-    """Get messages that exist in both our schema and pyubx2."""
-    if not pyubx2_available():
-        return []
-    
-    our_messages = get_all_messages()
-    pyubx2_messages = set(get_supported_messages())
+    """Get messages that exist in both our schema and pyubx2 (found once per session)."""
+    if not _get_adapter().is_available():
+        return ()
     
-    common = []
-    for msg in our_messages:
-        name = msg.get("name", "")
-        # Try various name formats
-        if name in pyubx2_messages:
-            common.append(msg)
-        elif name.replace("UBX-", "") in pyubx2_messages:
-            common.append(msg)
+    short_names = get_pyubx2_short_names()
     
-    return common
+    # Single pass; comparing prefix-less names covers both name formats
+    return tuple(
+        msg for msg in get_all_messages()
+        if msg.get("name", "").removeprefix("UBX-") in short_names
+    )
 
 
 class TestOurGeneratorPyubx2Parser:
     """Test: Our schema → Generate → pyubx2 parses."""
     
-    def test_pyubx2_can_parse_our_ack_ack(self):
+    def test_pyubx2_can_parse_our_ack_ack(self, messages_by_name):
         """Test that pyubx2 can parse our ACK-ACK message."""
-        msg = get_message_by_name("UBX-ACK-ACK")
+        msg = messages_by_name.get("UBX-ACK-ACK")
         if msg is None:
             pytest.skip("UBX-ACK-ACK not in schema")
         
@@ -60,28 +105,25 @@ class TestOurGeneratorPyubx2Parser:
         data = generate_ubx_message(msg, values)
         
         # Parse with pyubx2
-        result = parse_ubx_bytes(data)
+        result = _get_adapter().parse_ubx_bytes(data)
         
-        assert result is not None
-        assert result.get("parsed"), f"pyubx2 failed to parse: {result.get('error')}"
-        assert "ACK-ACK" in result.get("name", "")
+        assert result.parsed, f"pyubx2 failed to parse: {result.error}"
+        assert "ACK-ACK" in result.name
     
-    def test_pyubx2_can_parse_our_nav_pvt(self):
+    def test_pyubx2_can_parse_our_nav_pvt(self, messages_by_name):
         """Test that pyubx2 can parse our NAV-PVT message."""
-        msg = get_message_by_name("UBX-NAV-PVT")
+        msg = messages_by_name.get("UBX-NAV-PVT")
         if msg is None:
             pytest.skip("UBX-NAV-PVT not in schema")
         
         # Generate with test values
-        values = generate_test_values(msg)
-        data = generate_ubx_message(msg, values)
+        data = generate_test_frame("UBX-NAV-PVT")
         
         # Parse with pyubx2
-        result = parse_ubx_bytes(data)
+        result = _get_adapter().parse_ubx_bytes(data)
         
-        assert result is not None
-        assert result.get("parsed"), f"pyubx2 failed to parse: {result.get('error')}"
-        assert "NAV-PVT" in result.get("name", "")
+        assert result.parsed, f"pyubx2 failed to parse: {result.error}"
+        assert "NAV-PVT" in result.name
     
     @pytest.mark.parametrize("msg_name", [
         "UBX-NAV-POSLLH",
@@ -92,38 +134,36 @@ class TestOurGeneratorPyubx2Parser:
         "UBX-MON-VER",
         "UBX-INF-DEBUG",
     ])
-    def test_pyubx2_parses_common_messages(self, msg_name):
+    def test_pyubx2_parses_common_messages(self, messages_by_name, msg_name):
         """Test that pyubx2 can parse common messages from our schema."""
-        msg = get_message_by_name(msg_name)
+        msg = messages_by_name.get(msg_name)
         if msg is None:
             pytest.skip(f"{msg_name} not in schema")
         
-        values = generate_test_values(msg)
-        data = generate_ubx_message(msg, values)
+        data = generate_test_frame(msg_name)
         
-        result = parse_ubx_bytes(data)
+        result = _get_adapter().parse_ubx_bytes(data)
         
-        assert result is not None
-        assert result.get("parsed"), f"pyubx2 failed to parse {msg_name}: {result.get('error')}"
+        assert result.parsed, f"pyubx2 failed to parse {msg_name}: {result.error}"
 
 
 class TestPyubx2GeneratorOurParser:
     """Test: pyubx2 generates → Our parser parses."""
     
-    def test_our_parser_handles_pyubx2_ack_ack(self):
+    def test_our_parser_handles_pyubx2_ack_ack(self, messages_by_name):
         """Test that our parser can parse pyubx2-generated ACK-ACK."""
-        data = pyubx2_generate("ACK-ACK", {"clsID": 0x06, "msgID": 0x01})
+        data = pyubx2_generate_frame("ACK-ACK", (("clsID", 0x06), ("msgID", 0x01)))
         if data is None:
             pytest.skip("pyubx2 couldn't generate ACK-ACK")
         
-        msg_def = get_message_by_name("UBX-ACK-ACK")
+        msg_def = messages_by_name.get("UBX-ACK-ACK")
         result = parse_ubx_message(data, msg_def)
         
         assert result["parsed"]
         assert result["fields"].get("clsID") == 0x06
         assert result["fields"].get("msgID") == 0x01
     
-    def test_our_parser_handles_pyubx2_nav_posllh(self):
+    def test_our_parser_handles_pyubx2_nav_posllh(self, messages_by_name):
         """Test that our parser can parse pyubx2-generated NAV-POSLLH."""
         values = {
             "iTOW": 123456789,
@@ -134,11 +174,11 @@ class TestPyubx2GeneratorOurParser:
             "hAcc": 5000,
             "vAcc": 8000,
         }
-        data = pyubx2_generate("NAV-POSLLH", values)
+        data = pyubx2_generate_frame("NAV-POSLLH", tuple(sorted(values.items())))
         if data is None:
             pytest.skip("pyubx2 couldn't generate NAV-POSLLH")
         
-        msg_def = get_message_by_name("UBX-NAV-POSLLH")
+        msg_def = messages_by_name.get("UBX-NAV-POSLLH")
         result = parse_ubx_message(data, msg_def)
         
         assert result["parsed"]
@@ -148,11 +188,11 @@ class TestPyubx2GeneratorOurParser:
 class TestSchemaComparison:
     """Compare our schema definitions with pyubx2's."""
     
-    def test_count_common_messages(self):
+    def test_count_common_messages(self, all_messages, pyubx2_messages):
         """Count how many messages we share with pyubx2."""
         common = get_common_messages()
-        our_total = len(get_all_messages())
-        pyubx2_total = len(get_supported_messages())
+        our_total = len(all_messages)
+        pyubx2_total = len(pyubx2_messages)
         
         print(f"\nSchema overlap:")
         print(f"  Our messages: {our_total}")
@@ -163,19 +203,16 @@ class TestSchemaComparison:
         # Should have significant overlap
         assert len(common) > 50, "Too few common messages"
     
-    def test_nav_pvt_field_comparison(self):
+    def test_nav_pvt_field_comparison(self, field_names_by_msg):
         """Compare NAV-PVT fields between our schema and pyubx2."""
-        our_msg = get_message_by_name("UBX-NAV-PVT")
-        if our_msg is None:
+        our_fields = field_names_by_msg.get("UBX-NAV-PVT")
+        if our_fields is None:
             pytest.skip("UBX-NAV-PVT not in schema")
         
-        pyubx2_def = get_message_definition("NAV-PVT")
-        if pyubx2_def is None:
+        pyubx2_fields = get_pyubx2_field_names("NAV-PVT")
+        if pyubx2_fields is None:
             pytest.skip("NAV-PVT not in pyubx2")
         
-        our_fields = {f["name"] for f in our_msg.get("payload", {}).get("fields", [])}
-        pyubx2_fields = set(pyubx2_def.get("fields", {}).keys())
-        
         common = our_fields & pyubx2_fields
         our_only = our_fields - pyubx2_fields
         pyubx2_only = pyubx2_fields - our_fields
@@ -189,47 +226,75 @@ class TestSchemaComparison:
         assert len(common) > len(our_only), "Too few matching fields"
 
 
+# Fixed-length schema messages, filtered once at collection
+FIXED_LENGTH_MESSAGES = tuple(msg for msg in get_all_messages() if is_fixed_length(msg))
+
+# Fixed-length messages pyubx2 (as of 1.3.8) is known not to parse, with why.
+# Marked non-strict xfail, since other supported pyubx2 versions may parse
+# some of them; test_bulk_pass_rate still bounds the overall failures.
+PYUBX2_UNSUPPORTED = {
+    "UBX-MGA-ACK": "pyubx2 keys MGA-ACK on its type byte (DATA0 only)",
+    "UBX-MGA-ACK-DATA0": "pyubx2 keys MGA-ACK on its type byte, not set by test values",
+    "UBX-MGA-INI-TIME-GNSS": "pyubx2 defines MGA-INI only as an input (SET) message",
+    "UBX-MGA-INI-TIME-UTC": "pyubx2 defines MGA-INI only as an input (SET) message",
+    "UBX-RXM-PMREQ-CMD": "pyubx2 defines RXM-PMREQ only as an input (SET) message",
+}
+
+
+def bulk_params():
+    """FIXED_LENGTH_MESSAGES as params, known pyubx2 gaps marked xfail."""
+    params = []
+    for msg in FIXED_LENGTH_MESSAGES:
+        name = msg.get("name", "UNKNOWN")
+        reason = PYUBX2_UNSUPPORTED.get(name)
+        marks = (pytest.mark.xfail(strict=False, reason=reason),) if reason else ()
+        params.append(pytest.param(msg, id=name, marks=marks))
+    return params
+
+
+@lru_cache(maxsize=1)
+def get_bulk_parse_results():
+    """pyubx2 results for every fixed-length message, by name.
+
+    All frames are generated first and then parsed with parse_many, one
+    batch per schema message_type so pyubx2 reads each in the right mode,
+    the first time any bulk test asks.
+    """
+    names_by_type = {}
+    for msg in FIXED_LENGTH_MESSAGES:
+        names_by_type.setdefault(msg.get("message_type", "output"), []).append(msg.get("name", "UNKNOWN"))
+    
+    results = {}
+    for message_type, names in names_by_type.items():
+        frames = [generate_test_frame(name) for name in names]
+        results.update(zip(names, _get_adapter().parse_many(frames, message_type)))
+    return results
+
+
 class TestBulkValidation:
     """Bulk validation of all compatible messages."""
     
-    def test_all_fixed_length_messages_parse_with_pyubx2(self):
-        """Test all fixed-length messages can be parsed by pyubx2."""
-        messages = get_all_messages()
-        
-        passed = 0
-        failed = 0
-        skipped = 0
-        failures = []
-        
-        for msg in messages:
-            name = msg.get("name", "UNKNOWN")
-            payload = msg.get("payload", {})
-            length = payload.get("length", {})
-            
-            # Skip variable length
-            if not (isinstance(length, dict) and "fixed" in length):
-                if not isinstance(length, int):
-                    skipped += 1
-                    continue
-            
-            try:
-                values = generate_test_values(msg)
-                data = generate_ubx_message(msg, values)
-                result = parse_ubx_bytes(data)
-                
-                if result and result.get("parsed"):
-                    passed += 1
-                else:
-                    failed += 1
-                    failures.append((name, result.get("error", "unknown")))
-            except Exception as e:
-                failed += 1
-                failures.append((name, str(e)))
+    @pytest.mark.parametrize("msg", bulk_params())
+    def test_fixed_length_message_parses_with_pyubx2(self, msg):
+        """Test a fixed-length message can be parsed by pyubx2.
+
+        Messages pyubx2 is known not to handle are listed in
+        PYUBX2_UNSUPPORTED and expected to fail.
+        """
+        name = msg.get("name", "UNKNOWN")
+        result = get_bulk_parse_results()[name]
+        assert result.parsed, f"pyubx2 could not parse {name}: {result.error}"
+    
+    def test_bulk_pass_rate(self):
+        """Enough fixed-length messages should parse with pyubx2."""
+        results = get_bulk_parse_results()
+        failures = [(name, result.error) for name, result in results.items() if not result.parsed]
+        passed = len(results) - len(failures)
         
         print(f"\nBulk validation results:")
         print(f"  Passed: {passed}")
-        print(f"  Failed: {failed}")
-        print(f"  Skipped (variable length): {skipped}")
+        print(f"  Failed: {len(failures)}")
+        print(f"  Skipped (variable length): {len(get_all_messages()) - len(FIXED_LENGTH_MESSAGES)}")
         
         if failures:
             print(f"\nFailures (first 10):")
@@ -237,7 +302,7 @@ class TestBulkValidation:
                 print(f"  {name}: {error}")
         
         # Allow some failures (pyubx2 may not support all messages)
-        pass_rate = passed / (passed + failed) if (passed + failed) > 0 else 0
+        pass_rate = passed / len(results)
         assert pass_rate > 0.5, f"Pass rate too low: {pass_rate:.1%}"
 
 
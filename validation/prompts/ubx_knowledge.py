@@ -8,6 +8,59 @@ Contains accumulated knowledge about:
 - Data type mappings
 """
 
+from functools import lru_cache
+from string import Formatter
+
+
+def _compile_template(template: str, **static: str) -> tuple:
+    """Split a str.format template into literal text and field names, once.
+
+    The result alternates literal, field name, literal, ... (always odd
+    length), with {{ }} escapes already undone, so rendering is a single
+    join instead of re-parsing the template on every call. Fields given in
+    static are filled in here and folded into the surrounding literal text.
+    """
+    parts = []
+    text = ""
+    for literal, field, spec, conversion in Formatter().parse(template):
+        text += literal
+        if field is None:
+            continue
+        if field in static:
+            text += static[field]
+            continue
+        if spec or conversion:
+            raise ValueError(f"Unsupported format spec in template field '{field}'")
+        parts += (text, field)
+        text = ""
+    parts.append(text)
+    return tuple(parts)
+
+
+def _render_template(parts: tuple, values: dict) -> str:
+    """Fill a template compiled by _compile_template from values."""
+    pieces = list(parts)
+    pieces[1::2] = [str(values[field]) for field in parts[1::2]]
+    return "".join(pieces)
+
+
+def _encode_template(parts: tuple) -> tuple:
+    """UTF-8 encode the literal text of compiled template parts, once."""
+    encoded = list(parts)
+    encoded[::2] = [literal.encode() for literal in parts[::2]]
+    return tuple(encoded)
+
+
+def _render_template_bytes(parts: tuple, values: dict) -> bytes:
+    """Fill a template from _encode_template, giving UTF-8 bytes.
+
+    Only the per-call values are encoded; the literal text already is.
+    """
+    pieces = list(parts)
+    pieces[1::2] = [str(values[field]).encode() for field in parts[1::2]]
+    return b"".join(pieces)
+
+
 # Core UBX protocol knowledge
 UBX_PROTOCOL_OVERVIEW = """
 ## UBX Protocol Structure
@@ -248,13 +301,30 @@ Return a JSON object:
 ```
 """
 
+# Templates split once at import, with the knowledge-base sections already
+# filled in; only the per-call fields are left to substitute
+_VALIDATION_PROMPT_PARTS = _compile_template(
+    VALIDATION_PROMPT_TEMPLATE,
+    ubx_overview=UBX_PROTOCOL_OVERVIEW,
+    gotchas=EXTRACTION_GOTCHAS,
+    version_patterns=VERSION_PATTERNS,
+)
+_CONFIG_KEY_VALIDATION_PARTS = _compile_template(
+    CONFIG_KEY_VALIDATION_TEMPLATE,
+    ubx_overview=UBX_PROTOCOL_OVERVIEW,
+    config_key_knowledge=CONFIG_KEY_KNOWLEDGE,
+)
+_VALIDATION_PROMPT_PARTS_B = _encode_template(_VALIDATION_PROMPT_PARTS)
+_CONFIG_KEY_VALIDATION_PARTS_B = _encode_template(_CONFIG_KEY_VALIDATION_PARTS)
+
 
 def build_message_validation_prompt(
     canonical_json: str,
     device_family: str | None = None,
     protocol_version: int | None = None,
     firmware_version: str | None = None,
-) -> str:
+    as_bytes: bool = False,
+) -> str | bytes:
     """Build a complete validation prompt for a message.
     
     Args:
@@ -262,6 +332,8 @@ def build_message_validation_prompt(
         device_family: Device family (M8, F9, M10, etc.)
         protocol_version: Protocol version as integer (e.g., 2700 for 27.00)
         firmware_version: Firmware version string
+        as_bytes: Return the prompt UTF-8 encoded, for callers that send
+            raw request bodies
     """
     # Build manual context section
     if device_family or protocol_version or firmware_version:
@@ -288,22 +360,21 @@ note it as a valid variation rather than a discrepancy."""
     else:
         manual_context = "No version metadata available for this manual."
     
-    return VALIDATION_PROMPT_TEMPLATE.format(
-        ubx_overview=UBX_PROTOCOL_OVERVIEW,
-        gotchas=EXTRACTION_GOTCHAS,
-        version_patterns=VERSION_PATTERNS,
-        manual_context=manual_context,
-        canonical_json=canonical_json,
-    )
+    values = {
+        "manual_context": manual_context,
+        "canonical_json": canonical_json,
+    }
+    if as_bytes:
+        return _render_template_bytes(_VALIDATION_PROMPT_PARTS_B, values)
+    return _render_template(_VALIDATION_PROMPT_PARTS, values)
 
 
-def build_config_key_validation_prompt(canonical_json: str) -> str:
-    """Build a complete validation prompt for config keys."""
-    return CONFIG_KEY_VALIDATION_TEMPLATE.format(
-        ubx_overview=UBX_PROTOCOL_OVERVIEW,
-        config_key_knowledge=CONFIG_KEY_KNOWLEDGE,
-        canonical_json=canonical_json,
-    )
+def build_config_key_validation_prompt(canonical_json: str, as_bytes: bool = False) -> str | bytes:
+    """Build a complete validation prompt for config keys (UTF-8 bytes if as_bytes)."""
+    values = {"canonical_json": canonical_json}
+    if as_bytes:
+        return _render_template_bytes(_CONFIG_KEY_VALIDATION_PARTS_B, values)
+    return _render_template(_CONFIG_KEY_VALIDATION_PARTS, values)
 
 
 # Bitfield extraction prompt - specialized for extracting bit-level details
@@ -455,31 +526,35 @@ Extract the COMPLETE definition for message {message_name} from the PDF pages pr
 ```
 """
 
+_BITFIELD_EXTRACTION_PARTS = _compile_template(BITFIELD_EXTRACTION_TEMPLATE)
+_MESSAGE_EXTRACTION_PARTS = _compile_template(
+    MESSAGE_EXTRACTION_TEMPLATE,
+    ubx_overview=UBX_PROTOCOL_OVERVIEW,
+)
+
+# Bit count per bitfield data type (unknown types are treated as X1)
+_BIT_COUNTS = {"X1": 8, "X2": 16, "X4": 32, "X8": 64}
 
+
+@lru_cache(maxsize=4096)
 def build_bitfield_extraction_prompt(
     message_name: str,
     field_name: str,
     data_type: str,
 ) -> str:
-    """Build a prompt for extracting a specific bitfield definition."""
-    # Determine bit count from data type
-    bit_counts = {"X1": 8, "X2": 16, "X4": 32, "X8": 64}
-    bit_count = bit_counts.get(data_type, 8)
-
-    return BITFIELD_EXTRACTION_TEMPLATE.format(
-        message_name=message_name,
-        field_name=field_name,
-        data_type=data_type,
-        bit_count=bit_count,
-    )
+    """Build a prompt for extracting a specific bitfield definition (memoized)."""
+    return _render_template(_BITFIELD_EXTRACTION_PARTS, {
+        "message_name": message_name,
+        "field_name": field_name,
+        "data_type": data_type,
+        "bit_count": _BIT_COUNTS.get(data_type, 8),
+    })
 
 
+@lru_cache(maxsize=4096)
 def build_message_extraction_prompt(message_name: str) -> str:
-    """Build a prompt for extracting a complete message definition."""
-    return MESSAGE_EXTRACTION_TEMPLATE.format(
-        ubx_overview=UBX_PROTOCOL_OVERVIEW,
-        message_name=message_name,
-    )
+    """Build a prompt for extracting a complete message definition (memoized)."""
+    return _render_template(_MESSAGE_EXTRACTION_PARTS, {"message_name": message_name})
 
 
 # Enum extraction prompt - for extracting enum values for E-type config keys
@@ -563,6 +638,8 @@ For CFG-NAVSPG-DYNMODEL (E1 type), a correct extraction might be:
 ```
 """
 
+_ENUM_EXTRACTION_PARTS = _compile_template(ENUM_EXTRACTION_TEMPLATE)
+
 
 def build_enum_extraction_prompt(key_name: str, data_type: str = "E1") -> str:
     """Build a prompt for extracting enum values for a config key.
@@ -571,7 +648,7 @@ def build_enum_extraction_prompt(key_name: str, data_type: str = "E1") -> str:
         key_name: The config key name (e.g., "CFG-NAVSPG-DYNMODEL")
         data_type: The enum data type (E1, E2, or E4)
     """
-    return ENUM_EXTRACTION_TEMPLATE.format(
-        key_name=key_name,
-        data_type=data_type,
-    )
+    return _render_template(_ENUM_EXTRACTION_PARTS, {
+        "key_name": key_name,
+        "data_type": data_type,
+    })